@@ -9,6 +9,11 @@ from starlette.responses import JSONResponse
 
 from app.company import schemas
 from app.company.service import CompanyService
+from app.pagination import (
+    Page,
+    PageParams
+    )
+from app.responses import ModelResponse
 from app.user.auth_service import get_current_user
 from app.user.schemas import User
 from app.user.tokenizator import JWTBearer
@@ -24,12 +29,15 @@ async def create_company(
         company_data: schemas.CompanyCreate,
         user=Depends(get_current_user)
         ):
-    return await CompanyService().create_company(company_data, user)
+    return ModelResponse(await CompanyService().create_company(company_data, user))
 
 
-@company_router.get("/list", response_model=list[schemas.Company], dependencies=[Depends(JWTBearer())])
-async def get_user_companies(user: User = Depends(get_current_user)):
-    return await CompanyService(user_id=user.id).get_list_companies()
+@company_router.get("/list", response_model=Page[schemas.Company], dependencies=[Depends(JWTBearer())])
+async def get_user_companies(
+        params: PageParams = Depends(),
+        user: User = Depends(get_current_user)
+        ):
+    return ModelResponse(await CompanyService(user_id=user.id).get_list_companies(params))
 
 
 @company_router.get("/{company_id}", response_model=schemas.Company, dependencies=[Depends(JWTBearer())])
@@ -37,7 +45,7 @@ async def get_company(
         company_id: uuid.UUID,
         user: User = Depends(get_current_user)
         ):
-    return await CompanyService(user.id, company_id).get_company()
+    return ModelResponse(await CompanyService(user.id, company_id).get_company())
 
 
 @company_router.put("/{company_id}", response_model=schemas.Company, dependencies=[Depends(JWTBearer())])
@@ -46,7 +54,7 @@ async def update_company(
         company_data: schemas.CompanyUpdate,
         user: User = Depends(get_current_user)
         ):
-    return await CompanyService(user.id, company_id).update_company(company_data)
+    return ModelResponse(await CompanyService(user.id, company_id).update_company(company_data))
 
 
 @company_router.delete("/company_id", dependencies=[Depends(JWTBearer())])
@@ -1,5 +1,6 @@
 import uuid
 
+import sqlalchemy
 from fastapi import (
     HTTPException,
     status
@@ -7,6 +8,17 @@ from fastapi import (
 
 from app import models
 from app.company import schemas
+from app.db import (
+    database,
+    update_returning
+    )
+from app.pagination import (
+    Page,
+    PageParams,
+    paginate
+    )
+from app.responses import prevalidated
+from app.user.schemas import User
 
 
 class CompanyService:
@@ -16,19 +28,18 @@ class CompanyService:
         self.company_id = company_id
 
     @staticmethod
-    async def create_company(company_data: schemas.CompanyCreate, user: models.User) -> schemas.Company:
-        # TODO: refactor getting user from db
-        user = await models.User.objects.filter(id=user.id).first()
+    async def create_company(company_data: schemas.CompanyCreate, user: User) -> schemas.Company:
+        # the owner's primary key is enough for the foreign key, no need to load the row
         company = await models.Company.objects.create(
             id=uuid.uuid4(),
             **company_data.dict(),
-            owner=user
+            owner=user.id
             )
-        return schemas.Company.parse_obj(company)
+        return prevalidated(schemas.Company, company)
 
-    async def get_list_companies(self) -> list[schemas.Company]:
-        companies = await models.Company.objects.filter(owner=self.user_id).all()
-        return [schemas.Company.parse_obj(company) for company in companies]
+    async def get_list_companies(self, params: PageParams) -> Page[schemas.Company]:
+        companies = models.Company.objects.filter(owner=self.user_id)
+        return await paginate(companies, schemas.Company, params)
 
     async def get_company(self) -> schemas.Company:
         try:
@@ -38,7 +49,7 @@ class CompanyService:
                 status_code=status.HTTP_404_NOT_FOUND
                 )
 
-        return schemas.Company.parse_obj(company)
+        return prevalidated(schemas.Company, company)
 
     async def update_company(self, company_data: schemas.CompanyUpdate) -> schemas.Company:
         new_data = dict()
@@ -46,14 +57,29 @@ class CompanyService:
         for key, value in company_data.dict().items():
             if value:
                 new_data[key] = value
-        await models.Company.objects.filter(
+        company = await update_returning(
+            models.Company,
+            new_data,
             id=self.company_id,
             owner=self.user_id
-            ).update(**new_data)
-        company = await self.get_company()
-        return schemas.Company.parse_obj(company)
+            )
+        if company is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND
+                )
+        return prevalidated(schemas.Company, company)
 
     async def delete_company(self):
-        await models.Contact.objects.delete(company=self.company_id)
-        await models.Project.objects.delete(company=self.company_id)
-        await models.Company.objects.delete(id=self.company_id, owner=self.user_id)
+        companies = models.Company.Meta.table
+        contacts = models.Contact.Meta.table
+        projects = models.Project.Meta.table
+
+        # children are only removed when the company really belongs to the user
+        owned_company = sqlalchemy.select(companies.c.id).where(
+            companies.c.id == self.company_id,
+            companies.c.owner == self.user_id
+            )
+        async with database.transaction():
+            await database.execute(contacts.delete().where(contacts.c.company.in_(owned_company)))
+            await database.execute(projects.delete().where(projects.c.company.in_(owned_company)))
+            await database.execute(companies.delete().where(companies.c.id.in_(owned_company)))
@@ -14,9 +14,40 @@ class Settings(BaseSettings):
     # app settings
     server_host: str = "http://localhost"
     server_port: int = 8000
+    # shared secret for the internal /metrics endpoints, sent as X-Metrics-Token; unset disables them
+    metrics_token: str | None = None
+    # outbound http settings
+    http_timeout: float = 5.0
+    http_connect_timeout: float = 2.0
+    http_max_connections: int = 50
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry: float = 30.0
+
     # db settings
     db_url: str = f"postgresql://{os.getenv('DATABASE_USER')}:{os.getenv('DATABASE_PASSWORD')}" \
                   f"@{os.getenv('DATABASE_HOST')}:{os.getenv('DATABASE_PORT')}/{os.getenv('DATABASE_NAME')}"
+    db_pool_min_size: int = 5
+    db_pool_max_size: int = 20
+    db_pool_acquire_timeout: float = 5.0
+    db_statement_cache_size: int = 100
+
+    # avatars settings
+    avatar_dir: str = "avatars"
+    # in-flight uploads, never served; same filesystem as avatar_dir so publishing is an atomic rename
+    avatar_upload_dir: str = "avatar_uploads"
+    # uploads older than this were left by a crash, startup removes them
+    avatar_upload_max_age: int = 3600
+    avatar_max_size: int = 2 * 1024 * 1024
+    avatar_chunk_size: int = 64 * 1024
+    avatar_cache_max_age: int = 365 * 24 * 3600
+
+    # list endpoints pagination settings
+    page_size_default: int = 50
+    page_size_max: int = 200
+
+    # dashboard settings
+    dashboard_max_companies: int = 100
+    dashboard_items_per_company: int = 20
 
     # cors settings
     frontend_url: str
@@ -26,12 +57,27 @@ class Settings(BaseSettings):
     jwt_secret: str
     jwt_algorithm: str
     jwt_exp: int = 60
+    token_cache_size: int = 4096
+    token_cache_ttl: int = 60
+
+    # password hashing pool settings
+    hash_pool_size: int = 2
+    hash_queue_depth: int = 32
+    hash_timeout: float = 5.0
+
+    # user cache settings
+    user_cache_size: int = 1024
+    user_cache_ttl: int = 30
 
     # google open_id settings
     google_client_id: str
     google_client_secret: str
     google_discovery_url: str = "https://accounts.google.com/.well-known/openid-configuration"
 
+    # open_id provider documents cache settings
+    oidc_cache_default_ttl: int = 3600
+    jwks_min_refresh_interval: int = 300
+
     # azure open_id settings
     azure_client_id: str
     azure_tenant_id: str
@@ -48,16 +94,46 @@ class Settings(BaseSettings):
     mail_ssl: bool = False
     use_credentials: bool = True
     validate_credentials: bool = True
+    smtp_timeout: float = 10.0
+    # pooled smtp sessions, reused across messages
+    smtp_pool_size: int = 2
+    smtp_noop_interval: float = 30.0
+    smtp_session_max_messages: int = 500
+
+    # email outbox settings, mail_backend "smtp" or "stub" (in-process server, nothing leaves the host)
+    mail_backend: str = "smtp"
+    outbox_max_size: int = 10_000
+    outbox_batch_size: int = 20
+    outbox_max_attempts: int = 5
+    outbox_retry_base_delay: float = 1.0
+    outbox_retry_max_delay: float = 60.0
+    outbox_drain_timeout: float = 5.0
 
     # ssh keys settings
-    ssh_key_size: int = 128
+    ssh_key_size: int = 2048
+    # refills of the ready-made pool below use one worker, keep at least one more for requests
+    keygen_pool_size: int = 2
+    keygen_queue_depth: int = 8
+    keygen_timeout: float = 30.0
+    # ready-made pairs kept in memory, 0 disables the pool
+    ssh_key_pool_size: int = 4
+    ssh_key_pool_low_water_mark: int = 1
     max_number_ssh_keys: int = 100
+    ssh_presigned_url_ttl: int = 60
+    ssh_key_max_upload_size: int = 16 * 1024
+    ssh_upload_chunk_size: int = 4 * 1024
+
+    # key storage settings, "s3" or "local"
+    storage_backend: str = "s3"
+    local_storage_dir: str = "storage"
+    storage_chunk_size: int = 64 * 1024
 
     # aws storage settings
-    s3_bucket_name: str
-    aws_access_key_id: str
-    aws_secret_access_key: str
-    aws_region_name: str
+    s3_bucket_name: str | None = None
+    aws_access_key_id: str | None = None
+    aws_secret_access_key: str | None = None
+    aws_region_name: str | None = None
+    s3_max_pool_connections: int = 10
 
 
 settings = Settings(
@@ -3,9 +3,11 @@ from typing import Union
 
 from pydantic import BaseModel, EmailStr
 
+from app.models import ContactType
+
 
 class BaseContact(BaseModel):
-    type: str
+    type: ContactType
     name: str
     email: EmailStr
     phone_num: str
@@ -16,6 +18,10 @@ class BaseContact(BaseModel):
     country: str
     zip: str
 
+    class Config:
+        # ormar stores the plain value
+        use_enum_values = True
+
 
 class Contact(BaseContact):
     id: uuid.UUID
@@ -29,7 +35,7 @@ class ContactCreate(BaseContact):
 
 
 class ContactUpdate(BaseModel):
-    type: Union[str | None]
+    type: Union[ContactType | None]
     name: Union[str | None]
     email: Union[EmailStr | None]
     phone_num: Union[str | None]
@@ -39,3 +45,6 @@ class ContactUpdate(BaseModel):
     state: Union[str | None]
     country: Union[str | None]
     zip: Union[str | None]
+
+    class Config:
+        use_enum_values = True
@@ -1,7 +1,19 @@
 import uuid
 
+from fastapi import (
+    HTTPException,
+    status
+    )
+
 from app import models
 from app.contact import schemas
+from app.db import update_returning
+from app.pagination import (
+    Page,
+    PageParams,
+    paginate
+    )
+from app.responses import prevalidated
 
 
 class ContactService:
@@ -16,19 +28,19 @@ class ContactService:
             **contact_data.dict(),
             company=self.company_id[0]
             )
-        return schemas.Contact.parse_obj(contact)
+        return prevalidated(schemas.Contact, contact)
 
     async def get_contact(self) -> schemas.Contact:
         contact = await models.Contact.objects.filter(
             id=self.contact_id
             ).first()
-        return schemas.Contact.parse_obj(contact)
+        return prevalidated(schemas.Contact, contact)
 
-    async def get_contacts_list(self) -> list[schemas.Contact]:
-        contacts = await models.Contact.objects.filter(
+    async def get_contacts_list(self, params: PageParams) -> Page[schemas.Contact]:
+        contacts = models.Contact.objects.filter(
             company=self.company_id[0]
-            ).all()
-        return [schemas.Contact.parse_obj(contact) for contact in contacts]
+            )
+        return await paginate(contacts, schemas.Contact, params)
 
     async def update_contact(self, contact_data: schemas.ContactUpdate) -> schemas.Contact:
         new_data = dict()
@@ -37,12 +49,15 @@ class ContactService:
             if value:
                 new_data[key] = value
 
-        await models.Contact.objects.filter(
-            id=self.contact_id,
-            company=self.company_id[0]
-            ).update(**new_data)
+        filters = {"id": self.contact_id}
+        # the update route only knows the contact id
+        if self.company_id[0] is not None:
+            filters["company"] = self.company_id[0]
 
-        return await self.get_contact()
+        contact = await update_returning(models.Contact, new_data, **filters)
+        if contact is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+        return prevalidated(schemas.Contact, contact)
 
     async def delete_contact(self) -> None:
         await models.Contact.objects.delete(
@@ -0,0 +1,24 @@
+from fastapi import (
+    APIRouter,
+    Depends
+    )
+
+from app.dashboard import schemas
+from app.dashboard.service import DashboardService
+from app.responses import ModelResponse
+from app.user.auth_service import get_current_user
+from app.user.schemas import User
+from app.user.tokenizator import JWTBearer
+
+dashboard_router = APIRouter(
+    prefix="/dashboard",
+    tags=["dashboard"]
+    )
+
+
+@dashboard_router.get("", response_model=schemas.Dashboard, dependencies=[Depends(JWTBearer())])
+async def get_dashboard(
+        depth: schemas.DashboardDepth = schemas.DashboardDepth.counts,
+        user: User = Depends(get_current_user)
+        ):
+    return ModelResponse(await DashboardService(user).get_dashboard(depth))
@@ -0,0 +1,28 @@
+from enum import Enum
+
+from pydantic import BaseModel
+
+from app.company.schemas import Company
+from app.contact.schemas import Contact
+from app.project.schemas import Project
+from app.user.schemas import User
+
+
+class DashboardDepth(str, Enum):
+    companies = 'companies'
+    counts = 'counts'
+    full = 'full'
+
+
+class DashboardCompany(Company):
+    # filled from depth=counts on
+    project_count: int | None
+    contact_count: int | None
+    # filled for depth=full, at most dashboard_items_per_company of each
+    projects: list[Project] | None
+    contacts: list[Contact] | None
+
+
+class Dashboard(BaseModel):
+    user: User
+    companies: list[DashboardCompany]
@@ -0,0 +1,99 @@
+import uuid
+from collections import defaultdict
+
+import sqlalchemy
+from pydantic import BaseModel
+
+from app import models
+from app.config import settings
+from app.contact.schemas import Contact
+from app.dashboard import schemas
+from app.db import database
+from app.project.schemas import Project
+from app.responses import prevalidated
+from app.user.schemas import User
+
+
+def row_to_dict(row, table: sqlalchemy.Table) -> dict:
+    # indexing by column name runs the result processors (uuid columns are CHAR(32))
+    return {column.name: row[column.name] for column in table.columns}
+
+
+class DashboardService:
+    """THE USER'S WHOLE TREE IN A FIXED NUMBER OF QUERIES, HOWEVER MANY COMPANIES THERE ARE
+
+    depth=companies: 1 query, depth=counts: 3, depth=full: 5;
+    children are matched through a subselect on the same capped, ordered
+    companies the dashboard returns, never on every company the user owns
+    """
+
+    def __init__(self, user: User):
+        self.user = user
+        companies = models.Company.Meta.table
+        # the same ids, order and cap as get_companies
+        self.shown_companies = sqlalchemy.select(companies.c.id).where(
+            companies.c.owner == user.id
+            ).order_by(companies.c.id).limit(settings.dashboard_max_companies)
+
+    async def get_companies(self) -> list[dict]:
+        companies = models.Company.Meta.table
+        rows = await database.fetch_all(
+            sqlalchemy.select(companies).where(
+                companies.c.owner == self.user.id
+                ).order_by(companies.c.id).limit(settings.dashboard_max_companies)
+            )
+        return [row_to_dict(row, companies) for row in rows]
+
+    async def count_children(self, table: sqlalchemy.Table) -> dict[uuid.UUID, int]:
+        rows = await database.fetch_all(
+            sqlalchemy.select(
+                table.c.company,
+                sqlalchemy.func.count().label('total')
+                ).where(table.c.company.in_(self.shown_companies)).group_by(table.c.company)
+            )
+        return {row['company']: row['total'] for row in rows}
+
+    async def get_children(self, table: sqlalchemy.Table, schema: type[BaseModel]) -> dict[uuid.UUID, list]:
+        """FIRST dashboard_items_per_company ROWS OF EVERY SHOWN COMPANY, ONE QUERY FOR ALL OF THEM"""
+        ranked = sqlalchemy.select(
+            table,
+            sqlalchemy.func.row_number().over(
+                partition_by=table.c.company,
+                order_by=table.c.id
+                ).label('position')
+            ).where(table.c.company.in_(self.shown_companies)).subquery()
+        rows = await database.fetch_all(
+            sqlalchemy.select(ranked).where(
+                ranked.c.position <= settings.dashboard_items_per_company
+                ).order_by(ranked.c.company, ranked.c.position)
+            )
+        children = defaultdict(list)
+        for row in rows:
+            children[row['company']].append(prevalidated(schema, row_to_dict(row, table)))
+        return children
+
+    async def get_dashboard(self, depth: schemas.DashboardDepth) -> schemas.Dashboard:
+        contacts = models.Contact.Meta.table
+        projects = models.Project.Meta.table
+
+        # one after another on purpose: databases keeps the request's connection in a
+        # ContextVar, so gathered queries would share it and queue on its lock anyway
+        companies = await self.get_companies()
+        project_counts = contact_counts = project_lists = contact_lists = None
+        if depth != schemas.DashboardDepth.companies:
+            project_counts = await self.count_children(projects)
+            contact_counts = await self.count_children(contacts)
+        if depth == schemas.DashboardDepth.full:
+            project_lists = await self.get_children(projects, Project)
+            contact_lists = await self.get_children(contacts, Contact)
+
+        dashboard_companies = []
+        for company in companies:
+            if project_counts is not None:
+                company['project_count'] = project_counts.get(company['id'], 0)
+                company['contact_count'] = contact_counts.get(company['id'], 0)
+            if project_lists is not None:
+                company['projects'] = project_lists.get(company['id'], [])
+                company['contacts'] = contact_lists.get(company['id'], [])
+            dashboard_companies.append(prevalidated(schemas.DashboardCompany, company))
+        return schemas.Dashboard.construct(user=self.user, companies=dashboard_companies)
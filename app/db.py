@@ -1,14 +1,112 @@
+import asyncio
+import time
+
 import databases
 import sqlalchemy
 import ormar
+from fastapi import (
+    HTTPException,
+    status
+    )
 
 from app.config import settings
 
+DB_POOL_EXHAUSTED_EXCEPTION = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail='Database is busy, try again later',
+    headers={'Retry-After': '1'},
+    )
+
 metadata = sqlalchemy.MetaData()
-database = databases.Database(settings.db_url)
-engine = sqlalchemy.create_engine(settings.db_url)
+database = databases.Database(
+    settings.db_url,
+    min_size=settings.db_pool_min_size,
+    max_size=settings.db_pool_max_size,
+    statement_cache_size=settings.db_statement_cache_size,
+    )
 
 
 class MainMeta(ormar.ModelMeta):
     metadata = metadata
     database = database
+
+
+async def update_returning(model: type[ormar.Model], values: dict, **filters) -> dict | None:
+    """UPDATE ... RETURNING *: THE UPDATED ROW IN ONE ROUND TRIP, NONE IF NOTHING MATCHED"""
+    table = model.Meta.table
+    # the same checks QuerySet.update runs before it builds the statement
+    values = model.translate_columns_to_aliases(model.validate_choices(dict(values)))
+    conditions = [table.c[name] == value for name, value in filters.items()]
+    if values:
+        query = table.update().where(*conditions).values(**values).returning(*table.c)
+    else:
+        query = table.select().where(*conditions)
+    row = await database.fetch_one(query)
+    if row is None:
+        return None
+    # indexing (not row._mapping) applies the column result processors, e.g. ormar's UUID
+    return {column.name: row[column.name] for column in table.c}
+
+
+class InstrumentedPool:
+    """WRAPS THE ASYNCPG POOL USED BY databases: ACQUIRE TIMEOUT AND WAIT METRICS"""
+
+    def __init__(self, pool, acquire_timeout: float):
+        self._pool = pool
+        self.acquire_timeout = acquire_timeout
+        self.waiting = 0
+        self.acquired = 0
+        self.timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    async def acquire(self):
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            connection = await self._pool.acquire(timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise DB_POOL_EXHAUSTED_EXCEPTION
+        finally:
+            self.waiting -= 1
+        waited = time.perf_counter() - started
+        self.acquired += 1
+        self.wait_time_total += waited
+        self.wait_time_max = max(self.wait_time_max, waited)
+        return connection
+
+    def __getattr__(self, name: str):
+        return getattr(self._pool, name)
+
+    def stats(self) -> dict:
+        size = self._pool.get_size()
+        idle = self._pool.get_idle_size()
+        return {
+            "min_size": self._pool.get_min_size(),
+            "max_size": self._pool.get_max_size(),
+            "size": size,
+            "in_use": size - idle,
+            "idle": idle,
+            "waiting": self.waiting,
+            "acquired": self.acquired,
+            "acquire_timeouts": self.timeouts,
+            "acquire_wait_ms_avg": self.wait_time_total / self.acquired * 1000 if self.acquired else 0.0,
+            "acquire_wait_ms_max": self.wait_time_max * 1000,
+            }
+
+
+async def connect_database(database_: databases.Database) -> None:
+    # asyncpg opens min_size connections here, so the first requests don't pay for them
+    await database_.connect()
+    backend = database_._backend
+    # databases has no hook around pool.acquire(), so wrap the pool it holds
+    if getattr(backend, "_pool", None) is not None and not isinstance(backend._pool, InstrumentedPool):
+        backend._pool = InstrumentedPool(backend._pool, settings.db_pool_acquire_timeout)
+
+
+def get_pool_stats(database_: databases.Database) -> dict:
+    pool = getattr(database_._backend, "_pool", None)
+    if not isinstance(pool, InstrumentedPool):
+        return {"connected": False}
+    return {"connected": True, **pool.stats()}
@@ -0,0 +1,61 @@
+import httpx
+
+from app.config import settings
+from app.user.exceptions import (
+    INVALID_TOKEN_EXCEPTION,
+    SSO_PROVIDER_EXCEPTION
+    )
+
+_client: httpx.AsyncClient | None = None
+
+
+def create_http_client(transport: httpx.AsyncBaseTransport | None = None) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(
+            settings.http_timeout,
+            connect=settings.http_connect_timeout
+            ),
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry
+            ),
+        transport=transport
+        )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = create_http_client()
+    return _client
+
+
+async def start_http_client(transport: httpx.AsyncBaseTransport | None = None) -> None:
+    global _client
+    if _client is None:
+        _client = create_http_client(transport)
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def fetch(method: str, url: str, **kwargs) -> httpx.Response:
+    """CALL AN IDENTITY PROVIDER, MAPPING FAILURES TO HTTP ERRORS"""
+    try:
+        response = await get_http_client().request(method, url, **kwargs)
+        response.raise_for_status()
+    except httpx.HTTPStatusError:
+        raise INVALID_TOKEN_EXCEPTION
+    except httpx.HTTPError:
+        raise SSO_PROVIDER_EXCEPTION
+    return response
+
+
+async def fetch_json(method: str, url: str, **kwargs) -> dict:
+    response = await fetch(method, url, **kwargs)
+    return response.json()
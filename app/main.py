@@ -1,23 +1,37 @@
+import os
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from starlette.middleware.cors import CORSMiddleware
-from starlette.staticfiles import StaticFiles
 
 from app.company.routes import company_router
 from app.config import settings
 from app.contact.routes import contact_router
+from app.dashboard.routes import dashboard_router
 from app.db import (
-    database,
-    engine,
-    metadata
+    connect_database,
+    database
+    )
+from app.http_client import (
+    close_http_client,
+    start_http_client
     )
+from app.monitoring.routes import monitoring_router
 from app.project.routes import project_router
+from app.ssh.keygen import key_pair_pool
 from app.ssh.routes import ssh_router
+from app.ssh.storage import close_storage
+from app.static import AvatarFiles
 from app.user.auth_routes import auth_router
+from app.user.avatars import remove_stale_uploads
+from app.user.hashing import hash_pool
+from app.user.oidc_cache import warm_up as warm_up_oidc_cache
+from app.user.outbox import email_outbox
 from app.user.routes import user_router
 
 allowed_cors = [settings.frontend_url, settings.backend_url]
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_cors,
@@ -26,23 +40,32 @@ app.add_middleware(
     allow_headers=["*"],
     )
 
-app.mount('/avatars', StaticFiles(directory='avatars'), name='avatars')
+# the directory is created in startup(), not checked at import time
+app.mount('/avatars', AvatarFiles(directory=settings.avatar_dir, check_dir=False), name='avatars')
 app.include_router(auth_router)
 app.include_router(user_router)
 app.include_router(company_router)
 app.include_router(project_router)
 app.include_router(contact_router)
 app.include_router(ssh_router)
+app.include_router(dashboard_router)
+app.include_router(monitoring_router)
 
 app.state.database = database
-metadata.create_all(engine)
 
 
 @app.on_event('startup')
 async def startup() -> None:
+    os.makedirs(settings.avatar_dir, exist_ok=True)
+    os.makedirs(settings.avatar_upload_dir, exist_ok=True)
+    remove_stale_uploads()
     database_ = app.state.database
     if not database_.is_connected:
-        await database_.connect()
+        await connect_database(database_)
+    await start_http_client()
+    await warm_up_oidc_cache()
+    await key_pair_pool.start()
+    await email_outbox.start()
 
 
 @app.on_event('shutdown')
@@ -50,3 +73,8 @@ async def shutdown() -> None:
     database_ = app.state.database
     if database_.is_connected:
         await database_.disconnect()
+    await email_outbox.stop()
+    await close_http_client()
+    await close_storage()
+    await key_pair_pool.stop()
+    hash_pool.shutdown()
@@ -0,0 +1,8 @@
+from app.migrations.runner import run_migrations
+
+if __name__ == "__main__":
+    applied = run_migrations()
+    for version, name in applied:
+        print(f"applied {version:04d} {name}")
+    if not applied:
+        print("schema is up to date")
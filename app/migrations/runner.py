@@ -0,0 +1,71 @@
+import importlib
+import pkgutil
+from types import ModuleType
+
+import sqlalchemy
+from sqlalchemy.engine import Connection
+
+from app.config import settings
+from app.migrations import versions
+
+# arbitrary key for pg_advisory_lock, keeps two runners from applying the same version
+MIGRATIONS_LOCK_ID = 7_150_342
+
+CREATE_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name VARCHAR(200) NOT NULL,
+    applied_at TIMESTAMP NOT NULL DEFAULT now()
+)
+"""
+
+
+def load_migrations() -> list[ModuleType]:
+    """VERSION MODULES FROM app/migrations/versions, ORDERED BY THEIR version"""
+    migrations = [
+        importlib.import_module(f"{versions.__name__}.{module.name}")
+        for module in pkgutil.iter_modules(versions.__path__)
+        ]
+    return sorted(migrations, key=lambda migration: migration.version)
+
+
+def get_applied_versions(connection: Connection) -> set[int]:
+    rows = connection.execute(sqlalchemy.text("SELECT version FROM schema_migrations"))
+    return {row[0] for row in rows}
+
+
+def record_migration(connection: Connection, migration: ModuleType) -> None:
+    connection.execute(
+        sqlalchemy.text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+        {"version": migration.version, "name": migration.name}
+        )
+
+
+def run_migrations(db_url: str = None) -> list[tuple[int, str]]:
+    engine = sqlalchemy.create_engine(db_url or settings.db_url)
+    applied = []
+    try:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_connection:
+            lock_connection.execute(sqlalchemy.text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATIONS_LOCK_ID})
+            try:
+                lock_connection.execute(sqlalchemy.text(CREATE_MIGRATIONS_TABLE))
+                done = get_applied_versions(lock_connection)
+
+                for migration in load_migrations():
+                    if migration.version in done:
+                        continue
+                    if migration.transactional:
+                        with engine.begin() as connection:
+                            migration.upgrade(connection)
+                            record_migration(connection, migration)
+                    else:
+                        # e.g. CREATE INDEX CONCURRENTLY, which can't run inside a transaction
+                        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                            migration.upgrade(connection)
+                            record_migration(connection, migration)
+                    applied.append((migration.version, migration.name))
+            finally:
+                lock_connection.execute(sqlalchemy.text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATIONS_LOCK_ID})
+    finally:
+        engine.dispose()
+    return applied
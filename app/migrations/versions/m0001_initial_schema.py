@@ -0,0 +1,95 @@
+import sqlalchemy
+from sqlalchemy.engine import Connection
+
+version = 1
+name = "initial schema"
+transactional = True
+
+# the schema app/main.py used to build with create_all, frozen here so later
+# model changes only ever reach the database through their own migration;
+# IF NOT EXISTS keeps it a no-op on databases create_all already built
+STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id CHAR(32) NOT NULL,
+        email VARCHAR(30) NOT NULL,
+        avatar VARCHAR(500),
+        first_name VARCHAR(50) NOT NULL,
+        last_name VARCHAR(50) NOT NULL,
+        password_hash VARCHAR(300),
+        is_email_verif BOOLEAN,
+        is_active BOOLEAN NOT NULL,
+        PRIMARY KEY (id),
+        UNIQUE (id),
+        UNIQUE (email)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ssh_pairs (
+        owner_id CHAR(32) NOT NULL,
+        gen_date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+        pair_name VARCHAR(50) NOT NULL,
+        uuid_ CHAR(32) NOT NULL,
+        owner_name VARCHAR(100) NOT NULL,
+        fp_pub VARCHAR(150) NOT NULL,
+        fp_prvt VARCHAR(150) NOT NULL,
+        PRIMARY KEY (uuid_),
+        UNIQUE (owner_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS companies (
+        id CHAR(32) NOT NULL,
+        company_name VARCHAR(100) NOT NULL,
+        address_1 VARCHAR(100),
+        address_2 VARCHAR(100),
+        city VARCHAR(100),
+        state VARCHAR(100),
+        country VARCHAR(50),
+        zip VARCHAR(10),
+        owner CHAR(32),
+        PRIMARY KEY (id),
+        UNIQUE (id),
+        CONSTRAINT fk_companies_users_id_owner FOREIGN KEY (owner) REFERENCES users (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS contacts (
+        id CHAR(32) NOT NULL,
+        type VARCHAR(40) NOT NULL,
+        name VARCHAR(50) NOT NULL,
+        email VARCHAR(100) NOT NULL,
+        phone_num VARCHAR(30) NOT NULL,
+        address_1 VARCHAR(100) NOT NULL,
+        address_2 VARCHAR(100) NOT NULL,
+        city VARCHAR(100) NOT NULL,
+        state VARCHAR(100) NOT NULL,
+        country VARCHAR(50) NOT NULL,
+        zip VARCHAR(10) NOT NULL,
+        company CHAR(32),
+        PRIMARY KEY (id),
+        UNIQUE (id),
+        CONSTRAINT fk_contacts_companies_id_company FOREIGN KEY (company) REFERENCES companies (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS projects (
+        id CHAR(32) NOT NULL,
+        name VARCHAR(70) NOT NULL,
+        start_date DATE NOT NULL,
+        end_date DATE NOT NULL,
+        resp_person VARCHAR(100) NOT NULL,
+        summary VARCHAR(300) NOT NULL,
+        company CHAR(32),
+        PRIMARY KEY (id),
+        UNIQUE (id),
+        UNIQUE (name),
+        CONSTRAINT fk_projects_companies_id_company FOREIGN KEY (company) REFERENCES companies (id)
+    )
+    """,
+]
+
+
+def upgrade(connection: Connection) -> None:
+    for statement in STATEMENTS:
+        connection.execute(sqlalchemy.text(statement))
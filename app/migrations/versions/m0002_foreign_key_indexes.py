@@ -0,0 +1,20 @@
+import sqlalchemy
+from sqlalchemy.engine import Connection
+
+version = 2
+name = "foreign key indexes"
+transactional = False
+
+STATEMENTS = [
+    # SSHPair.owner_id used to be unique, which allowed a single key per user
+    "ALTER TABLE ssh_pairs DROP CONSTRAINT IF EXISTS ssh_pairs_owner_id_key",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_ssh_pairs_owner_id ON ssh_pairs (owner_id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_companies_owner ON companies (owner)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_contacts_company ON contacts (company)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_projects_company ON projects (company)",
+]
+
+
+def upgrade(connection: Connection) -> None:
+    for statement in STATEMENTS:
+        connection.execute(sqlalchemy.text(statement))
@@ -0,0 +1,24 @@
+import sqlalchemy
+from sqlalchemy.engine import Connection
+
+version = 3
+name = "keyset pagination indexes"
+transactional = False
+
+STATEMENTS = [
+    # list endpoints filter on the parent and page on the id, the composite
+    # indexes serve both and make the single column ones from 0002 redundant
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_companies_owner_id ON companies (owner, id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_contacts_company_id ON contacts (company, id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_projects_company_id ON projects (company, id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_ssh_pairs_owner_id_uuid_ ON ssh_pairs (owner_id, uuid_)",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_companies_owner",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_contacts_company",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_projects_company",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_ssh_pairs_owner_id",
+]
+
+
+def upgrade(connection: Connection) -> None:
+    for statement in STATEMENTS:
+        connection.execute(sqlalchemy.text(statement))
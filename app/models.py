@@ -26,6 +26,7 @@ class User(ormar.Model):
 class Company(ormar.Model):
     class Meta(MainMeta):
         tablename = "companies"
+        constraints = [ormar.IndexColumns("owner", "id")]
 
     id: uuid.UUID = ormar.UUID(primary_key=True, unique=True)
     company_name: str = ormar.String(max_length=100)
@@ -49,6 +50,7 @@ class ContactType(Enum):
 class Contact(ormar.Model):
     class Meta(MainMeta):
         tablename = "contacts"
+        constraints = [ormar.IndexColumns("company", "id")]
 
     id: uuid.UUID = ormar.UUID(primary_key=True, unique=True)
     type: str = ormar.String(max_length=40, choices=ContactType)
@@ -68,6 +70,7 @@ class Contact(ormar.Model):
 class Project(ormar.Model):
     class Meta(MainMeta):
         tablename = "projects"
+        constraints = [ormar.IndexColumns("company", "id")]
 
     id: uuid.UUID = ormar.UUID(primary_key=True, unique=True)
     name: str = ormar.String(max_length=70, unique=True)
@@ -82,8 +85,9 @@ class Project(ormar.Model):
 class SSHPair(ormar.Model):
     class Meta(MainMeta):
         tablename = "ssh_pairs"
+        constraints = [ormar.IndexColumns("owner_id", "uuid_")]
 
-    owner_id: uuid.UUID = ormar.UUID(unique=True)
+    owner_id: uuid.UUID = ormar.UUID()
     gen_date: sqlalchemy.DateTime = ormar.DateTime()
     pair_name: str = ormar.String(max_length=50)
     uuid_: uuid.UUID = ormar.UUID(primary_key=True)
@@ -0,0 +1,10 @@
+from fastapi import HTTPException, status
+
+METRICS_DISABLED_EXCEPTION = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND,
+    detail='Not Found',
+    )
+METRICS_FORBIDDEN_EXCEPTION = HTTPException(
+    status_code=status.HTTP_403_FORBIDDEN,
+    detail='Missing or wrong metrics token',
+    )
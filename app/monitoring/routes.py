@@ -0,0 +1,65 @@
+import secrets
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header
+    )
+
+from app.config import settings
+
+from app.db import (
+    database,
+    get_pool_stats
+    )
+from app.monitoring.exceptions import (
+    METRICS_DISABLED_EXCEPTION,
+    METRICS_FORBIDDEN_EXCEPTION
+    )
+from app.ssh.keygen import key_pair_pool
+from app.user.outbox import email_outbox
+from app.user.user_cache import user_cache
+
+
+async def require_metrics_token(x_metrics_token: str | None = Header(None)) -> None:
+    """INTERNAL ONLY: END USERS' JWTS DON'T OPEN THESE, THE SCRAPER SENDS settings.metrics_token"""
+    if settings.metrics_token is None:
+        raise METRICS_DISABLED_EXCEPTION
+    if x_metrics_token is None or not secrets.compare_digest(
+            x_metrics_token.encode(),
+            settings.metrics_token.encode()
+            ):
+        raise METRICS_FORBIDDEN_EXCEPTION
+
+
+monitoring_router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+    dependencies=[Depends(require_metrics_token)],
+    include_in_schema=False
+    )
+
+
+@monitoring_router.get("/user-cache")
+async def get_user_cache_stats():
+    return user_cache.stats()
+
+
+@monitoring_router.get("/ssh-key-pool")
+async def get_ssh_key_pool_stats():
+    return key_pair_pool.stats()
+
+
+@monitoring_router.get("/db-pool")
+async def get_db_pool_stats():
+    return get_pool_stats(database)
+
+
+@monitoring_router.get("/outbox")
+async def get_outbox_stats():
+    return email_outbox.stats()
+
+
+@monitoring_router.get("/smtp")
+async def get_smtp_stats():
+    return email_outbox.sender.stats() if email_outbox.sender is not None else {}
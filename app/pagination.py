@@ -0,0 +1,87 @@
+import base64
+import binascii
+import uuid
+from typing import (
+    Generic,
+    Type,
+    TypeVar
+    )
+
+import ormar
+from fastapi import (
+    HTTPException,
+    Query,
+    status
+    )
+from pydantic import BaseModel
+from pydantic.generics import GenericModel
+
+from app.config import settings
+from app.db import database
+from app.responses import prevalidated
+
+ItemT = TypeVar("ItemT", bound=BaseModel)
+
+INVALID_CURSOR_EXCEPTION = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="Invalid pagination cursor"
+    )
+
+
+class Page(GenericModel, Generic[ItemT]):
+    items: list[ItemT]
+    # None on the last page
+    next_cursor: str | None
+
+
+class PageParams:
+    """LIMIT AND CURSOR QUERY PARAMS OF A LIST ENDPOINT"""
+
+    def __init__(
+            self,
+            limit: int = Query(settings.page_size_default, ge=1, le=settings.page_size_max),
+            cursor: str | None = Query(None)
+            ):
+        self.limit = limit
+        self.cursor = cursor
+
+
+def encode_cursor(last_id: uuid.UUID) -> str:
+    return base64.urlsafe_b64encode(last_id.bytes).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> uuid.UUID:
+    try:
+        return uuid.UUID(bytes=base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise INVALID_CURSOR_EXCEPTION
+
+
+async def paginate(
+        queryset: ormar.QuerySet,
+        schema: Type[ItemT],
+        params: PageParams,
+        order_by: str = "id"
+        ) -> Page[ItemT]:
+    """KEYSET PAGE OVER AN INDEXED UNIQUE COLUMN
+
+    the queryset must be filtered down to the owner/company already,
+    (filter column, order_by) is covered by a composite index
+    """
+    table = queryset.model.Meta.table
+    # one extra row tells whether there is a next page
+    query = queryset.order_by(order_by).limit(params.limit + 1).build_select_expression()
+    if params.cursor is not None:
+        # a column expression, not f"{order_by}__gt": ormar splits "uuid___gt" into "uuid" + "_gt"
+        query = query.where(table.c[order_by] > decode_cursor(params.cursor))
+    rows = await database.fetch_all(query)
+
+    next_cursor = None
+    if len(rows) > params.limit:
+        rows = rows[:params.limit]
+        next_cursor = encode_cursor(rows[-1][order_by])
+    # indexing by column name runs the result processors (uuid columns are CHAR(32))
+    return Page[schema].construct(
+        items=[prevalidated(schema, {column.name: row[column.name] for column in table.c}) for row in rows],
+        next_cursor=next_cursor
+        )
@@ -7,8 +7,13 @@ from fastapi import (
     )
 from fastapi.responses import JSONResponse
 
+from app.pagination import (
+    Page,
+    PageParams
+    )
 from app.project import schemas
 from app.project.service import ProjectService
+from app.responses import ModelResponse
 from app.user.tokenizator import JWTBearer
 
 project_router = APIRouter(
@@ -22,21 +27,22 @@ async def create_project(
         project_data: schemas.ProjectCreate,
         company_id: uuid.UUID,
         ):
-    return await ProjectService(company_id=company_id).create_project(project_data)
+    return ModelResponse(await ProjectService(company_id=company_id).create_project(project_data))
 
 
-@project_router.get("/", response_model=list[schemas.Project], dependencies=[Depends(JWTBearer())])
-async def get_projects_list(company_id: uuid.UUID):
-    return await ProjectService(company_id=company_id).get_projects_list()
+@project_router.get("/", response_model=Page[schemas.Project], dependencies=[Depends(JWTBearer())])
+async def get_projects_list(company_id: uuid.UUID, params: PageParams = Depends()):
+    return ModelResponse(await ProjectService(company_id=company_id).get_projects_list(params))
 
 
 @project_router.get("/{project_id}", response_model=schemas.Project, dependencies=[Depends(JWTBearer())])
 async def get_project(
         project_id: uuid.UUID,
         ):
-    return await ProjectService(
+    project = await ProjectService(
         project_id=project_id
         ).get_project()
+    return ModelResponse(project)
 
 
 @project_router.put("/{project_id}", response_model=schemas.Project, dependencies=[Depends(JWTBearer())])
@@ -44,9 +50,10 @@ async def update_project(
         project_id: uuid.UUID,
         project_data: schemas.ProjectUpdate
         ):
-    return await ProjectService(
+    project = await ProjectService(
         project_id=project_id
         ).update_project(project_data)
+    return ModelResponse(project)
 
 
 @project_router.delete("/project_id", dependencies=[Depends(JWTBearer())])
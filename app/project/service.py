@@ -7,7 +7,14 @@ from fastapi import (
     )
 
 from app import models
+from app.db import update_returning
+from app.pagination import (
+    Page,
+    PageParams,
+    paginate
+    )
 from app.project import schemas
+from app.responses import prevalidated
 
 
 class ProjectService:
@@ -31,7 +38,7 @@ class ProjectService:
                 status_code=status.HTTP_406_NOT_ACCEPTABLE,
                 detail="Project with same name is already exists"
                 )
-        return schemas.Project.parse_obj(project)
+        return prevalidated(schemas.Project, project)
 
     async def get_project(self) -> schemas.Project:
         # TODO: check for needles company_id
@@ -42,13 +49,13 @@ class ProjectService:
                 ).first()
         except Exception:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
-        return schemas.Project.parse_obj(project)
+        return prevalidated(schemas.Project, project)
 
-    async def get_projects_list(self) -> list[schemas.Project]:
-        projects = await models.Project.objects.filter(
+    async def get_projects_list(self, params: PageParams) -> Page[schemas.Project]:
+        projects = models.Project.objects.filter(
             company=self.company_id[0]
-            ).all()
-        return [schemas.Project.parse_obj(project) for project in projects]
+            )
+        return await paginate(projects, schemas.Project, params)
 
     async def update_project(self, project_data) -> schemas.Project:
         new_data = dict()
@@ -56,16 +63,16 @@ class ProjectService:
         for key, value in project_data.dict().items():
             if value:
                 new_data[key] = value
-        # TODO: Check for needless of try block
         try:
-            await models.Project.objects.filter(
-                id=self.project_id,
-                # company=self.company_id
-                ).update(**new_data)
-        except Exception:
+            project = await update_returning(models.Project, new_data, id=self.project_id)
+        except UniqueViolationError:
+            raise HTTPException(
+                status_code=status.HTTP_406_NOT_ACCEPTABLE,
+                detail="Project with same name is already exists"
+                )
+        if project is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
-        project = await self.get_project()
-        return schemas.Project.parse_obj(project)
+        return prevalidated(schemas.Project, project)
 
     async def delete_project(self) -> None:
         await models.Project.objects.delete(
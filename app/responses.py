@@ -0,0 +1,42 @@
+from collections.abc import Mapping
+from typing import (
+    Any,
+    Type,
+    TypeVar
+    )
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from pydantic.json import pydantic_encoder
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def prevalidated(schema: Type[ModelT], source: Any) -> ModelT:
+    """BUILD A SCHEMA FROM AN ORMAR ROW OR A RETURNING DICT WITHOUT VALIDATING IT AGAIN
+
+    only for data that already went through validation on the way into the database
+    """
+    if isinstance(source, Mapping):
+        values = {name: source[name] for name in schema.__fields__ if name in source}
+    else:
+        values = {name: getattr(source, name) for name in schema.__fields__ if hasattr(source, name)}
+    return schema.construct(**values)
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.dict()
+    return pydantic_encoder(obj)
+
+
+class ModelResponse(ORJSONResponse):
+    """RENDERS PYDANTIC MODELS WITH orjson AND SKIPS THE response_model PASS
+
+    the route keeps response_model for the openapi schema, but FastAPI does not
+    validate and jsonable_encode a returned Response again
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,64 @@
+import asyncio
+from collections import deque
+
+
+class SMTPStubServer:
+    """IN-PROCESS SMTP SERVER FOR LOCAL RUNS AND BENCHMARKS
+
+    speaks just enough SMTP for aiosmtplib (EHLO, MAIL, RCPT, DATA, RSET,
+    NOOP, QUIT), has no TLS and no AUTH, keeps the last messages in memory;
+    latency is added to every reply to imitate a remote server
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, keep_last: int = 100):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.messages: deque[bytes] = deque(maxlen=keep_last)
+        self.received = 0
+        self.connections = 0
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _reply(self, writer: asyncio.StreamWriter, line: str) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        writer.write(line.encode() + b"\r\n")
+        await writer.drain()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            await self._reply(writer, "220 stub ESMTP ready")
+            while line := await reader.readline():
+                command = line.decode(errors="replace").strip().split(" ", 1)[0].upper()
+                if command == "EHLO":
+                    await self._reply(writer, "250-stub\r\n250-8BITMIME\r\n250 SMTPUTF8")
+                elif command in ("HELO", "MAIL", "RCPT", "RSET", "NOOP"):
+                    await self._reply(writer, "250 OK")
+                elif command == "DATA":
+                    await self._reply(writer, "354 End data with <CR><LF>.<CR><LF>")
+                    data = []
+                    while (body_line := await reader.readline()) not in (b".\r\n", b""):
+                        data.append(body_line)
+                    self.messages.append(b"".join(data))
+                    self.received += 1
+                    await self._reply(writer, "250 OK queued")
+                elif command == "QUIT":
+                    await self._reply(writer, "221 Bye")
+                    break
+                else:
+                    await self._reply(writer, "502 Command not implemented")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
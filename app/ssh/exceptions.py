@@ -0,0 +1,19 @@
+from fastapi import HTTPException, status
+
+KEYGEN_BUSY_EXCEPTION = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail='Too many key generation requests, try again later',
+    headers={'Retry-After': '1'},
+    )
+KEY_TOO_LARGE_EXCEPTION = HTTPException(
+    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+    detail='Key file is too large',
+    )
+INVALID_KEY_FORMAT_EXCEPTION = HTTPException(
+    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+    detail='Key file is not a PEM or OpenSSH key of the expected type',
+    )
+DOWNLOAD_URL_UNSUPPORTED_EXCEPTION = HTTPException(
+    status_code=status.HTTP_409_CONFLICT,
+    detail='This storage backend can not create download URLs, use mode=stream',
+    )
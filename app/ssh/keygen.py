@@ -0,0 +1,100 @@
+import asyncio
+from collections import deque
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+
+from app.config import settings
+from app.ssh.exceptions import KEYGEN_BUSY_EXCEPTION
+from app.workers import WorkerPool
+
+keygen_pool = WorkerPool(
+    max_workers=settings.keygen_pool_size,
+    queue_depth=settings.keygen_queue_depth,
+    timeout=settings.keygen_timeout,
+    busy_exception=KEYGEN_BUSY_EXCEPTION
+)
+
+
+def _generate_pair(key_size: int) -> tuple[bytes, bytes]:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=key_size)
+    # same PKCS#1 PEM layout the pure-python rsa package produced
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.PKCS1
+    )
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.TraditionalOpenSSL,
+        serialization.NoEncryption()
+    )
+    return public_pem, private_pem
+
+
+async def generate_pair() -> tuple[bytes, bytes]:
+    return await keygen_pool.run(_generate_pair, settings.ssh_key_size)
+
+
+class KeyPairPool:
+    """READY KEY PAIRS, REFILLED IN THE BACKGROUND BELOW THE LOW-WATER MARK"""
+
+    def __init__(self, size: int, low_water_mark: int):
+        self.size = size
+        self.low_water_mark = low_water_mark
+        self.hits = 0
+        self.misses = 0
+        self._pairs: deque[tuple[bytes, bytes]] = deque()
+        self._refill_task: asyncio.Task | None = None
+
+    async def get(self) -> tuple[bytes, bytes]:
+        if self._pairs:
+            self.hits += 1
+            pair = self._pairs.popleft()
+        else:
+            self.misses += 1
+            pair = await generate_pair()
+        if len(self._pairs) <= self.low_water_mark:
+            self._schedule_refill()
+        return pair
+
+    def _schedule_refill(self) -> None:
+        if self.size and (self._refill_task is None or self._refill_task.done()):
+            self._refill_task = asyncio.create_task(self._refill())
+
+    async def _refill(self) -> None:
+        # one job at a time: with keygen_pool_size >= 2 a request that misses the pool
+        # still finds a free worker, with a single worker it queues behind the refill
+        while len(self._pairs) < self.size:
+            try:
+                pair = await generate_pair()
+            except HTTPException:
+                return
+            self._pairs.append(pair)
+
+    def stats(self) -> dict:
+        return {
+            "ready": len(self._pairs),
+            "size": self.size,
+            "low_water_mark": self.low_water_mark,
+            "hits": self.hits,
+            "misses": self.misses,
+            "pending_jobs": keygen_pool.pending,
+            "rejected_jobs": keygen_pool.rejected
+        }
+
+    async def start(self) -> None:
+        self._schedule_refill()
+
+    async def stop(self) -> None:
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+            self._refill_task = None
+        self._pairs.clear()
+        keygen_pool.shutdown()
+
+
+key_pair_pool = KeyPairPool(
+    size=settings.ssh_key_pool_size,
+    low_water_mark=settings.ssh_key_pool_low_water_mark
+)
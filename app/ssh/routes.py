@@ -8,9 +8,26 @@ from fastapi import (
     HTTPException,
     status
 )
-from fastapi.responses import Response
+from fastapi.responses import (
+    JSONResponse,
+    RedirectResponse,
+    StreamingResponse
+)
 
-from app.ssh.schemas import SSHPair
+from app.config import settings
+from app.pagination import (
+    Page,
+    PageParams
+)
+from app.responses import (
+    ModelResponse,
+    prevalidated
+)
+from app.ssh.schemas import (
+    DownloadMode,
+    SSHKeyURL,
+    SSHPair
+)
 from app.ssh.ssh_keys import SSHService
 from app.user.auth_service import get_current_user
 from app.user.schemas import User
@@ -31,10 +48,10 @@ async def create_new_ssh_key(
     service = SSHService(user.id, user.email)
 
     ssh_pair = await service.create_ssh_pair(key_name)
-    return SSHPair.parse_obj(ssh_pair)
+    return ModelResponse(prevalidated(SSHPair, ssh_pair))
 
 
-@ssh_router.post('/add-ssh', dependencies=[Depends(JWTBearer())])
+@ssh_router.post('/add-ssh', response_model=SSHPair, dependencies=[Depends(JWTBearer())])
 async def add_new_ssh(
         key_name: str,
         public_key: UploadFile = File(...),
@@ -42,36 +59,67 @@ async def add_new_ssh(
         user: User = Depends(get_current_user)
 ):
     service = SSHService(user.id, user.email)
-    # pub, prv = await service.check_key_pair(public_key, private_key)
-    return await service.add_ssh_pair(public_key, private_key, key_name)
+    ssh_pair = await service.add_ssh_pair(public_key, private_key, key_name)
+    return ModelResponse(prevalidated(SSHPair, ssh_pair))
 
 
-@ssh_router.get('/my-ssh-keys', response_model=list[SSHPair], dependencies=[Depends(JWTBearer())])
-async def get_keys(user: User = Depends(get_current_user)):
+@ssh_router.get('/my-ssh-keys', response_model=Page[SSHPair], dependencies=[Depends(JWTBearer())])
+async def get_keys(
+        params: PageParams = Depends(),
+        user: User = Depends(get_current_user)
+):
     service = SSHService(user.id, user.email)
-    ssh_pairs = await service.get_my_keys_info()
-    return [SSHPair.parse_obj(pair) for pair in ssh_pairs]
+    return ModelResponse(await service.get_my_keys_info(params))
+
+
+async def download_key(service: SSHService, uuid_: uuid.UUID, type_: str, mode: DownloadMode):
+    if mode != DownloadMode.stream:
+        url = await service.get_download_url(uuid_, type_)
+        if mode == DownloadMode.redirect:
+            return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+        return ModelResponse(SSHKeyURL(url=url, expires_in=settings.ssh_presigned_url_ttl))
+
+    file_stream, file_name = await service.download_ssh_key(uuid_, type_)
+    headers = {'Content-Disposition': f'attachment; filename="{file_name}"'}
+    return StreamingResponse(file_stream, media_type='application/x-pem-file', headers=headers)
 
 
 @ssh_router.get('/download-ssh-pub', dependencies=[Depends(JWTBearer())])
-async def download_ssh_pub_key(uuid_: uuid.UUID, user: User = Depends(get_current_user)):
+async def download_ssh_pub_key(
+        uuid_: uuid.UUID,
+        mode: DownloadMode = DownloadMode.stream,
+        user: User = Depends(get_current_user)
+):
+    """STREAM THE PUBLIC KEY, OR HAND OUT A PRESIGNED URL FOR IT
+
+    mode=url and mode=redirect need a backend that presigns (s3), local storage answers 409
+    """
     service = SSHService(user.id, user.email)
-    file, file_name = await service.download_ssh_key(uuid_, 'public')
-    headers = {'Content-Disposition': f'attachment; filename="{file_name}"'}
-    return Response(file, headers=headers)
+    return await download_key(service, uuid_, 'public', mode)
 
 
 @ssh_router.get('/download-ssh-prv', dependencies=[Depends(JWTBearer())])
-async def download_ssh_prv_key(uuid_: uuid.UUID, user: User = Depends(get_current_user)):
+async def download_ssh_prv_key(
+        uuid_: uuid.UUID,
+        mode: DownloadMode = DownloadMode.stream,
+        user: User = Depends(get_current_user)
+):
+    """STREAM THE PRIVATE KEY, OR HAND OUT A PRESIGNED URL FOR IT
+
+    mode=url and mode=redirect need a backend that presigns (s3), local storage answers 409
+    """
     service = SSHService(user.id, user.email)
-    file, file_name = await service.download_ssh_key(uuid_, 'private')
-    headers = {'Content-Disposition': f'attachment; filename="{file_name}"'}
-    return Response(file, headers=headers)
+    return await download_key(service, uuid_, 'private', mode)
 
 
 @ssh_router.delete('/delete-ssh', dependencies=[Depends(JWTBearer())])
 async def delete_ssh_pair(uuid_: uuid.UUID, user: User = Depends(get_current_user)):
     service = SSHService(user.id, user.email)
-    resp = await service.delete_ssh(uuid_)
-    return resp
+    await service.delete_ssh(uuid_)
+    return JSONResponse(
+        {
+            "msg": status.HTTP_204_NO_CONTENT,
+            "details": "ssh pair has been deleted"
+        }
+    )
 
@@ -1,5 +1,6 @@
 import datetime
 import uuid
+from enum import Enum
 
 from pydantic import BaseModel
 
@@ -14,3 +15,13 @@ class SSHPair(BaseModel):
     class Config:
         orm_mode = True
 
+
+class DownloadMode(str, Enum):
+    stream = 'stream'
+    url = 'url'
+    redirect = 'redirect'
+
+
+class SSHKeyURL(BaseModel):
+    url: str
+    expires_in: int
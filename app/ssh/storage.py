@@ -0,0 +1,221 @@
+import asyncio
+import os
+import uuid
+from abc import (
+    ABC,
+    abstractmethod
+    )
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator
+
+import aiofiles
+import aiofiles.os
+
+from app.config import settings
+
+
+class ObjectNotFound(Exception):
+    pass
+
+
+class KeyStorage(ABC):
+    """OBJECT STORAGE USED BY SSHService FOR KEY FILES"""
+
+    @abstractmethod
+    async def put(self, key: str, data: bytes) -> None:
+        ...
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes:
+        ...
+
+    @abstractmethod
+    async def open_stream(self, key: str) -> AsyncIterator[bytes]:
+        """OPEN THE OBJECT NOW (RAISING ObjectNotFound) AND RETURN ITS BODY AS CHUNKS"""
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    async def delete_many(self, keys: list[str]) -> None:
+        await asyncio.gather(*(self.delete(key) for key in keys))
+
+    def presign(self, key: str, expires_in: int, file_name: str) -> str | None:
+        """SHORT-LIVED DIRECT DOWNLOAD URL, NONE IF THE BACKEND CAN'T MAKE ONE"""
+        return None
+
+    async def close(self) -> None:
+        pass
+
+
+class S3Storage(KeyStorage):
+    """S3 BACKEND, BOTO3 CALLS RUN IN A DEDICATED THREAD POOL"""
+
+    def __init__(
+            self,
+            bucket_name: str,
+            region_name: str,
+            aws_access_key_id: str,
+            aws_secret_access_key: str,
+            max_pool_connections: int
+            ):
+        import boto3
+        from botocore.config import Config
+
+        self.bucket_name = bucket_name
+        self._client = boto3.client(
+            service_name='s3',
+            region_name=region_name,
+            aws_access_key_id=aws_access_key_id,
+            aws_secret_access_key=aws_secret_access_key,
+            config=Config(
+                max_pool_connections=max_pool_connections,
+                signature_version='s3v4'
+                )
+            )
+        # one thread per pooled connection, so calls never queue on a socket
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_pool_connections,
+            thread_name_prefix='s3'
+            )
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def put(self, key: str, data: bytes) -> None:
+        await self._run(self._client.put_object, Bucket=self.bucket_name, Key=key, Body=data)
+
+    def _get_object(self, key: str) -> dict:
+        try:
+            return self._client.get_object(Bucket=self.bucket_name, Key=key)
+        except self._client.exceptions.NoSuchKey:
+            raise ObjectNotFound(key)
+
+    async def get(self, key: str) -> bytes:
+        response = await self._run(self._get_object, key)
+        return await self._run(response['Body'].read)
+
+    async def open_stream(self, key: str) -> AsyncIterator[bytes]:
+        response = await self._run(self._get_object, key)
+        return self._iter_body(response['Body'])
+
+    async def _iter_body(self, body) -> AsyncIterator[bytes]:
+        try:
+            while chunk := await self._run(body.read, settings.storage_chunk_size):
+                yield chunk
+        finally:
+            body.close()
+
+    def presign(self, key: str, expires_in: int, file_name: str) -> str | None:
+        # signed locally with the client credentials, no request is made
+        return self._client.generate_presigned_url(
+            'get_object',
+            Params={
+                'Bucket': self.bucket_name,
+                'Key': key,
+                'ResponseContentDisposition': f'attachment; filename="{file_name}"'
+                },
+            ExpiresIn=expires_in
+            )
+
+    async def delete(self, key: str) -> None:
+        await self._run(self._client.delete_object, Bucket=self.bucket_name, Key=key)
+
+    async def delete_many(self, keys: list[str]) -> None:
+        # one DeleteObjects request for the whole batch (S3 allows up to 1000 keys)
+        for start in range(0, len(keys), 1000):
+            await self._run(
+                self._client.delete_objects,
+                Bucket=self.bucket_name,
+                Delete={
+                    'Objects': [{'Key': key} for key in keys[start:start + 1000]],
+                    'Quiet': True
+                    }
+                )
+
+    async def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+class LocalStorage(KeyStorage):
+    """LOCAL DISK BACKEND FOR DEVELOPMENT AND BENCHMARKS"""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ObjectNotFound(key)
+        return path
+
+    async def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        await aiofiles.os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write aside and rename, readers never see a half-written key
+        tmp_path = f'{path}.{uuid.uuid4()}.tmp'
+        async with aiofiles.open(tmp_path, 'wb') as f:
+            await f.write(data)
+        await aiofiles.os.replace(tmp_path, path)
+
+    async def get(self, key: str) -> bytes:
+        try:
+            async with aiofiles.open(self._path(key), 'rb') as f:
+                return await f.read()
+        except FileNotFoundError:
+            raise ObjectNotFound(key)
+
+    async def open_stream(self, key: str) -> AsyncIterator[bytes]:
+        try:
+            f = await aiofiles.open(self._path(key), 'rb')
+        except FileNotFoundError:
+            raise ObjectNotFound(key)
+        return self._iter_file(f)
+
+    @staticmethod
+    async def _iter_file(f) -> AsyncIterator[bytes]:
+        try:
+            while chunk := await f.read(settings.storage_chunk_size):
+                yield chunk
+        finally:
+            await f.close()
+
+    async def delete(self, key: str) -> None:
+        try:
+            await aiofiles.os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+_storage: KeyStorage | None = None
+
+
+def create_storage() -> KeyStorage:
+    if settings.storage_backend == 'local':
+        return LocalStorage(settings.local_storage_dir)
+    if settings.storage_backend == 's3':
+        return S3Storage(
+            bucket_name=settings.s3_bucket_name,
+            region_name=settings.aws_region_name,
+            aws_access_key_id=settings.aws_access_key_id,
+            aws_secret_access_key=settings.aws_secret_access_key,
+            max_pool_connections=settings.s3_max_pool_connections
+            )
+    raise ValueError(f'unknown storage backend: {settings.storage_backend}')
+
+
+def get_storage() -> KeyStorage:
+    global _storage
+    if _storage is None:
+        _storage = create_storage()
+    return _storage
+
+
+async def close_storage() -> None:
+    global _storage
+    if _storage is not None:
+        await _storage.close()
+        _storage = None
@@ -0,0 +1,49 @@
+import httpx
+
+from app.config import settings
+from app.user.oidc_cache import JWKS_URI
+
+GOOGLE_TOKEN_ENDPOINT = "https://oauth2.googleapis.com/token"
+GOOGLE_USERINFO_ENDPOINT = "https://openidconnect.googleapis.com/v1/userinfo"
+
+
+def default_responses() -> dict[str, dict]:
+    return {
+        settings.google_discovery_url: {
+            "issuer": "https://accounts.google.com",
+            "token_endpoint": GOOGLE_TOKEN_ENDPOINT,
+            "userinfo_endpoint": GOOGLE_USERINFO_ENDPOINT,
+            },
+        GOOGLE_TOKEN_ENDPOINT: {
+            "access_token": "stub-access-token",
+            "token_type": "Bearer",
+            "expires_in": 3599,
+            },
+        GOOGLE_USERINFO_ENDPOINT: {
+            "email": "stub.user@example.com",
+            "family_name": "Stub",
+            "given_name": "User",
+            },
+        JWKS_URI: {
+            "keys": []
+            },
+        }
+
+
+class SSOStubTransport(httpx.MockTransport):
+    """SERVE CANNED DISCOVERY/TOKEN/USERINFO/JWKS RESPONSES WITHOUT THE NETWORK
+
+    usage: await start_http_client(transport=SSOStubTransport({JWKS_URI: {"keys": [...]}}))
+    """
+
+    def __init__(self, responses: dict[str, dict] = None):
+        self.responses = default_responses() | (responses or {})
+        self.calls: list[tuple[str, str]] = []
+        super().__init__(self._handle)
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        url = f"{request.url.scheme}://{request.url.host}{request.url.path}"
+        self.calls.append((request.method, url))
+        if url not in self.responses:
+            return httpx.Response(404, json={"error": f"no canned response for {url}"})
+        return httpx.Response(200, json=self.responses[url])
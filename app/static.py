@@ -0,0 +1,192 @@
+import os
+import re
+import stat
+from mimetypes import guess_type
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import (
+    FileResponse,
+    Response
+    )
+from starlette.staticfiles import (
+    NotModifiedResponse,
+    PathLike,
+    StaticFiles
+    )
+from starlette.types import (
+    Receive,
+    Scope,
+    Send
+    )
+
+from app.config import settings
+
+# names written by app.user.avatars.publish_avatar: sha256 of the content + extension
+CONTENT_ADDRESSED_RE = re.compile(r'^([0-9a-f]{64})(\.[a-z0-9]+)?$')
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+# preferred first
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """(first, last) BYTE OF A SINGLE RANGE, None WHEN IT CAN NOT BE SATISFIED
+
+    raises ValueError for anything that is not a single bytes range,
+    the caller then ignores the header and sends the whole file
+    """
+    match = RANGE_RE.match(header.strip())
+    if match is None:
+        raise ValueError(header)
+    first, last = match.groups()
+    if not first and not last:
+        raise ValueError(header)
+    if not first:
+        # suffix range: the last n bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            return None
+        return max(size - length, 0), size - 1
+    first = int(first)
+    last = min(int(last), size - 1) if last else size - 1
+    if first >= size or first > last:
+        return None
+    return first, last
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == '*':
+        return True
+    # If-None-Match uses weak comparison
+    return etag in (tag.strip().removeprefix('W/') for tag in header.split(','))
+
+
+class FileRangeResponse(Response):
+    """206 FOR ONE BYTE RANGE OF A FILE, STREAMED IN CHUNKS"""
+
+    chunk_size = 64 * 1024
+
+    def __init__(
+            self,
+            path: PathLike,
+            first: int,
+            last: int,
+            size: int,
+            headers: dict[str, str],
+            media_type: str,
+            method: str
+            ):
+        headers = dict(headers, **{
+            'content-range': f'bytes {first}-{last}/{size}',
+            'content-length': str(last - first + 1),
+            })
+        super().__init__(status_code=206, headers=headers, media_type=media_type)
+        self.path = path
+        self.first = first
+        self.last = last
+        self.send_header_only = method == 'HEAD'
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({'type': 'http.response.start', 'status': self.status_code, 'headers': self.raw_headers})
+        if self.send_header_only:
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+            return
+        remaining = self.last - self.first + 1
+        async with await anyio.open_file(self.path, mode='rb') as file:
+            await file.seek(self.first)
+            while remaining:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': remaining > 0})
+        if remaining:
+            # the file shrank under us, close the body anyway
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+
+class AvatarFiles(StaticFiles):
+    """StaticFiles FOR CONTENT-ADDRESSED AVATARS
+
+    a hashed name never changes its content, so it is cached as immutable and
+    its hash is a strong ETag; also answers single range requests and serves
+    .br/.gz siblings when the client accepts them
+    """
+
+    def file_response(
+            self,
+            full_path: PathLike,
+            stat_result: os.stat_result,
+            scope: Scope,
+            status_code: int = 200
+            ) -> Response:
+        method = scope['method']
+        request_headers = Headers(scope=scope)
+        match = CONTENT_ADDRESSED_RE.match(os.path.basename(full_path))
+        if match is None:
+            # not written by publish_avatar, keep the default revalidating behaviour
+            response = super().file_response(full_path, stat_result, scope, status_code)
+            response.headers['cache-control'] = 'no-cache'
+            return response
+
+        media_type = guess_type(str(full_path))[0] or 'application/octet-stream'
+        headers = {
+            'cache-control': f'public, max-age={settings.avatar_cache_max_age}, immutable',
+            'accept-ranges': 'bytes',
+            'vary': 'Accept-Encoding',
+            }
+        etag = match.group(1)
+        full_path, stat_result, encoding = self.lookup_precompressed(full_path, stat_result, request_headers)
+        if encoding is not None:
+            headers['content-encoding'] = encoding
+            etag = f'{etag}-{encoding}'
+        headers['etag'] = f'"{etag}"'
+
+        if_none_match = request_headers.get('if-none-match')
+        if if_none_match is not None and etag_matches(if_none_match, headers['etag']):
+            return NotModifiedResponse(Headers(headers))
+
+        range_header = request_headers.get('range')
+        if_range = request_headers.get('if-range')
+        if range_header is not None and (if_range is None or if_range.strip() == headers['etag']):
+            try:
+                byte_range = parse_range(range_header, stat_result.st_size)
+            except ValueError:
+                pass
+            else:
+                if byte_range is None:
+                    return Response(
+                        status_code=416,
+                        headers=dict(headers, **{'content-range': f'bytes */{stat_result.st_size}'})
+                        )
+                return FileRangeResponse(full_path, *byte_range, stat_result.st_size, headers, media_type, method)
+
+        return FileResponse(
+            full_path,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            stat_result=stat_result,
+            method=method
+            )
+
+    @staticmethod
+    def lookup_precompressed(
+            full_path: PathLike,
+            stat_result: os.stat_result,
+            request_headers: Headers
+            ) -> tuple[PathLike, os.stat_result, str | None]:
+        accepted = {
+            value.split(';')[0].strip()
+            for value in request_headers.get('accept-encoding', '').split(',')
+            }
+        for encoding, suffix in PRECOMPRESSED:
+            if encoding not in accepted:
+                continue
+            try:
+                variant_stat = os.stat(f'{full_path}{suffix}')
+            except OSError:
+                continue
+            if stat.S_ISREG(variant_stat.st_mode):
+                return f'{full_path}{suffix}', variant_stat, encoding
+        return full_path, stat_result, None
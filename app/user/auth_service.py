@@ -2,34 +2,43 @@ import base64
 import json
 import uuid
 
-import requests
+import sqlalchemy
 from asyncpg import UniqueViolationError
-from oauthlib.oauth2 import WebApplicationClient
-from passlib.hash import bcrypt
 from pydantic import EmailStr
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from starlette.requests import Request
 
 from app import models
-from app.company.schemas import CompanyCreate
-from app.company.service import CompanyService
 from app.config import settings
-from app.user import schemas
+from app.db import database
+from app.http_client import fetch_json
+from app.user import (
+    hashing,
+    schemas
+    )
 from app.user.exceptions import (
     UNIQUE_USER_EMAIL_EXCEPTION,
     CREDENTIALS_EXCEPTION,
     INACTIVE_USER_EXCEPTION
     )
+from app.user.oidc_cache import discovery_cache
 from app.user.tokenizator import (
+    JWTBearer,
     create_bearer_token,
+    get_user,
     validate_token,
     decode_azure_id_token
     )
+from app.user.user_cache import user_cache
 from app.user.user_service import UserService
 
 
 async def get_current_user(request: Request) -> schemas.User:
-    token = request.headers.get('Authorization').split(' ')[1]
-    user = await validate_token(token)
+    claims = getattr(request.state, "token_claims", None)
+    if claims is None:
+        await JWTBearer()(request)
+        claims = request.state.token_claims
+    user = await get_user(uuid.UUID(claims["sub"]))
     if user.is_active:
         return user
     raise INACTIVE_USER_EXCEPTION
@@ -39,30 +48,38 @@ class AuthService:
 
     def __init__(self, oauth_token: str = None):
         self.oauth_token = oauth_token
-        self.google_auth_client = WebApplicationClient(settings.google_client_id)
+        self._google_auth_client = None
+
+    @property
+    def google_auth_client(self):
+        # only the google callback needs oauthlib, don't load it for every AuthService
+        if self._google_auth_client is None:
+            from oauthlib.oauth2 import WebApplicationClient
+
+            self._google_auth_client = WebApplicationClient(settings.google_client_id)
+        return self._google_auth_client
 
     @staticmethod
-    def verify_password(plain_password: str, hashed_password: str) -> bool:
-        try:
-            return bcrypt.verify(plain_password, hashed_password)
-        except Exception:
-            raise CREDENTIALS_EXCEPTION
+    async def verify_password(plain_password: str, hashed_password: str) -> bool:
+        return await hashing.verify_password(plain_password, hashed_password)
 
     @staticmethod
-    def hash_password(password: str):
-        return bcrypt.hash(password)
+    async def hash_password(password: str) -> str:
+        return await hashing.hash_password(password)
 
     @staticmethod
     async def __activate_user(user_id: int) -> None:
         await models.User.objects.filter(id=user_id).update(is_active=True)
+        user_cache.invalidate(user_id)
 
     @staticmethod
     async def deactivate_user(user_id: int) -> None:
         await models.User.objects.filter(id=user_id).update(is_active=False)
+        user_cache.invalidate(user_id)
 
     @staticmethod
     async def __get_discovery_document(discovery_url: str) -> dict:
-        discovery_document = requests.get(discovery_url).json()
+        discovery_document = await discovery_cache.get(discovery_url)
         return discovery_document
 
     @staticmethod
@@ -115,78 +132,92 @@ class AuthService:
 
     async def set_new_pass(self, user_id: uuid.UUID, password: str):
         await models.User.objects.filter(id=user_id).update(
-            password_hash=self.hash_password(password)
+            password_hash=await self.hash_password(password)
             )
 
+    @staticmethod
+    async def __insert_user_with_company(user_values: dict, activate_existing: bool = False) -> tuple[uuid.UUID, bool]:
+        """INSERT THE USER AND THEIR DEFAULT COMPANY IN ONE ATOMIC STATEMENT
+
+        with activate_existing an existing email is upserted (is_active=True)
+        instead of failing; returns (user id, whether the user was created)
+        """
+        users = models.User.Meta.table
+        companies = models.Company.Meta.table
+
+        insert_user = pg_insert(users).values(**user_values)
+        if activate_existing:
+            insert_user = insert_user.on_conflict_do_update(
+                index_elements=[users.c.email],
+                set_={"is_active": True}
+                )
+        new_user = insert_user.returning(
+            users.c.id,
+            # xmax is 0 only for rows this statement inserted, not for upserted ones
+            sqlalchemy.literal_column("xmax = 0", type_=sqlalchemy.Boolean).label("inserted"),
+            users.c.email
+            ).cte("new_user")
+
+        new_company = companies.insert().from_select(
+            ["id", "company_name", "owner"],
+            sqlalchemy.select(
+                sqlalchemy.literal(uuid.uuid4(), type_=companies.c.id.type),
+                new_user.c.email,
+                new_user.c.id
+                ).where(new_user.c.inserted)
+            ).cte("new_company")
+
+        query = sqlalchemy.select(new_user.c.id, new_user.c.inserted).add_cte(new_company)
+        try:
+            row = await database.fetch_one(query)
+        except UniqueViolationError:
+            raise UNIQUE_USER_EMAIL_EXCEPTION
+        # by position: SQLAlchemy 1.4 also lists the CTE's RETURNING columns in the
+        # result map, so databases would look "id" up past the end of this 2-column row;
+        # the select is a prefix of that RETURNING, positions 0 and 1 get the right types
+        return row[0], row[1]
+
     async def __auth_via_openid(self, user_data: dict) -> schemas.Token:
-        user = await models.User.objects.get_or_none(
-            email=user_data["email"]
+        user_id, created = await self.__insert_user_with_company(
+            {
+                "id": uuid.uuid4(),
+                "email": user_data["email"],
+                "first_name": user_data["first_name"],
+                "last_name": user_data["last_name"],
+                "avatar": None,
+                "password_hash": None,
+                "is_email_verif": False,
+                "is_active": True
+                },
+            activate_existing=True
             )
+        user_cache.invalidate(user_id)
 
-        if not user:
+        if created:
             await UserService().send_email(
                 message="Welcome to platops dashboard",
                 email=[user_data["email"]]
                 )
-
-            try:
-                user = await models.User.objects.create(
-                    id=uuid.uuid4(),
-                    email=user_data["email"],
-                    first_name=user_data["first_name"],
-                    last_name=user_data["last_name"],
-                    avatar=None,
-                    password_hash=None,
-                    is_active=True
-                    )
-                _ = await CompanyService(user.id).create_company(
-                    company_data=CompanyCreate(
-                        company_name=user.email,
-                        address_1=None,
-                        address_2=None,
-                        city=None,
-                        state=None,
-                        country=None,
-                        zip=None
-                        ),
-                    user=user
-                    )
-            except UniqueViolationError:
-                raise UNIQUE_USER_EMAIL_EXCEPTION
-        await self.__activate_user(user.id)
-        return create_bearer_token(user.id)
+        return create_bearer_token(user_id)
 
     async def create_new_user(self, user_data: schemas.UserCreate) -> schemas.Token:
-        try:
-            user = await models.User.objects.create(
-                id=uuid.uuid4(),
-                email=user_data.email,
-                avatar=None,
-                first_name=user_data.first_name,
-                last_name=user_data.last_name,
-                password_hash=self.hash_password(user_data.password_hash),
-                is_active=True
-                )
-            _ = await CompanyService(user.id).create_company(
-                company_data=CompanyCreate(
-                    company_name=user.email,
-                    address_1=None,
-                    address_2=None,
-                    city=None,
-                    state=None,
-                    country=None,
-                    zip=None
-                    ),
-                user=user
-                )
-        except UniqueViolationError:
-            raise UNIQUE_USER_EMAIL_EXCEPTION
+        user_id, _ = await self.__insert_user_with_company(
+            {
+                "id": uuid.uuid4(),
+                "email": user_data.email,
+                "first_name": user_data.first_name,
+                "last_name": user_data.last_name,
+                "avatar": None,
+                "password_hash": await self.hash_password(user_data.password_hash),
+                "is_email_verif": False,
+                "is_active": True
+                }
+            )
         await UserService().send_email(
-            email=[user.email],
+            email=[user_data.email],
             message="Welcome to platops dashboard"
             )
-        await self.__activate_user(user.id)
-        return create_bearer_token(user.id)
+        return create_bearer_token(user_id)
 
     async def authenticate_user(self, email: str, password: str) -> schemas.Token:
         user = await models.User.objects.get_or_none(email=email)
@@ -194,7 +225,7 @@ class AuthService:
         if not user:
             raise CREDENTIALS_EXCEPTION
 
-        if not self.verify_password(password, user.password_hash):
+        if not await self.verify_password(password, user.password_hash):
             raise CREDENTIALS_EXCEPTION
         await self.__activate_user(user.id)
         return create_bearer_token(user.id)
@@ -211,18 +242,19 @@ class AuthService:
             redirect_url="postmessage",
             code=self.oauth_token
             )
-        token_response = requests.post(
+        token_response = await fetch_json(
+            "POST",
             token_url,
             headers=headers,
-            data=body,
+            content=body,
             auth=(settings.google_client_id, settings.google_client_secret)
             )
 
-        self.google_auth_client.parse_request_body_response(json.dumps(token_response.json()))
+        self.google_auth_client.parse_request_body_response(json.dumps(token_response))
         # Request user's information from Google
         uri, headers, body = self.google_auth_client.add_token(userinfo_endpoint)
-        userinfo_response = requests.get(uri, headers=headers, data=body)
-        user_info = dict(userinfo_response.json())
+        userinfo_response = await fetch_json("GET", uri, headers=headers, content=body)
+        user_info = dict(userinfo_response)
         user_data = self.__filter_user_info(user_info)
         return await self.__auth_via_openid(user_data)
 
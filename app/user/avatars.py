@@ -0,0 +1,100 @@
+import hashlib
+import os
+import time
+import uuid
+
+import aiofiles
+import aiofiles.os
+from fastapi import UploadFile
+
+from app import models
+from app.config import settings
+from app.db import database
+from app.user.exceptions import AVATAR_TOO_LARGE_EXCEPTION
+
+
+def get_extension(file_name: str | None) -> str:
+    ext = os.path.splitext((file_name or '').strip())[1].lower()
+    # the extension ends up in a path served to everyone, keep it boring
+    if not ext[1:].isalnum() or len(ext) > 10:
+        return ''
+    return ext
+
+
+async def stage_avatar(upload: UploadFile) -> tuple[str, str]:
+    """STREAM AN UPLOAD TO A TEMP FILE, RETURNS (TEMP PATH, CONTENT-ADDRESSED PATH)
+
+    the temp file only becomes the avatar in publish_avatar, under the avatar lock;
+    it lives outside avatar_dir so a half-written upload can't be fetched by URL
+    """
+    digest = hashlib.sha256()
+    tmp_path = os.path.join(settings.avatar_upload_dir, f'{uuid.uuid4()}.tmp')
+    size = 0
+    try:
+        async with aiofiles.open(tmp_path, 'wb') as out_file:
+            while chunk := await upload.read(settings.avatar_chunk_size):
+                size += len(chunk)
+                if size > settings.avatar_max_size:
+                    raise AVATAR_TOO_LARGE_EXCEPTION
+                digest.update(chunk)
+                await out_file.write(chunk)
+    except BaseException:
+        await discard_staged_avatar(tmp_path)
+        raise
+    return tmp_path, os.path.join(settings.avatar_dir, digest.hexdigest() + get_extension(upload.filename))
+
+
+async def discard_staged_avatar(tmp_path: str) -> None:
+    try:
+        await aiofiles.os.remove(tmp_path)
+    except FileNotFoundError:
+        pass
+
+
+def remove_stale_uploads() -> int:
+    """DELETE UPLOADS A CRASH LEFT BEHIND, RETURNS HOW MANY; RUNS ON STARTUP"""
+    removed = 0
+    cutoff = time.time() - settings.avatar_upload_max_age
+    with os.scandir(settings.avatar_upload_dir) as entries:
+        for entry in entries:
+            # younger files may belong to another worker's upload in progress
+            if entry.name.endswith('.tmp') and entry.is_file() and entry.stat().st_mtime < cutoff:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    continue
+                removed += 1
+    return removed
+
+
+async def lock_avatar(avatar_path: str) -> None:
+    """SERIALIZES PUBLISHING AND REMOVING ONE CONTENT-ADDRESSED FILE, HELD UNTIL THE TRANSACTION ENDS"""
+    await database.execute(
+        "SELECT pg_advisory_xact_lock(hashtext(:avatar_path))",
+        {"avatar_path": avatar_path}
+        )
+
+
+async def publish_avatar(tmp_path: str, avatar_path: str) -> None:
+    """MOVE A STAGED FILE INTO PLACE, CALLED INSIDE A TRANSACTION HOLDING lock_avatar"""
+    # same content, same name: replacing an existing copy is atomic and harmless
+    await aiofiles.os.replace(tmp_path, avatar_path)
+
+
+async def remove_avatar_if_unused(avatar_path: str | None) -> None:
+    """DELETE AN AVATAR FILE NO USER POINTS TO ANY MORE
+
+    the reference check and the unlink run under the same lock as
+    publish + update in UserService.update_avatar, so a user switching to
+    this file either commits first (and the file stays) or publishes it again
+    """
+    if not avatar_path:
+        return
+    async with database.transaction():
+        await lock_avatar(avatar_path)
+        if await models.User.objects.filter(avatar=avatar_path).exists():
+            return
+        try:
+            await aiofiles.os.remove(avatar_path)
+        except FileNotFoundError:
+            pass
@@ -17,3 +17,16 @@ INVALID_TOKEN_EXCEPTION = HTTPException(
     status_code=status.HTTP_401_UNAUTHORIZED,
     detail='Could not validate token from your auth provider',
     )
+AUTH_BUSY_EXCEPTION = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail='Too many authentication requests, try again later',
+    headers={'Retry-After': '1'},
+    )
+AVATAR_TOO_LARGE_EXCEPTION = HTTPException(
+    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+    detail='Avatar file is too large',
+    )
+SSO_PROVIDER_EXCEPTION = HTTPException(
+    status_code=status.HTTP_502_BAD_GATEWAY,
+    detail='Could not reach your auth provider',
+    )
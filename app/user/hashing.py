@@ -0,0 +1,34 @@
+from app.config import settings
+from app.user.exceptions import AUTH_BUSY_EXCEPTION
+from app.workers import WorkerPool
+
+hash_pool = WorkerPool(
+    max_workers=settings.hash_pool_size,
+    queue_depth=settings.hash_queue_depth,
+    timeout=settings.hash_timeout,
+    busy_exception=AUTH_BUSY_EXCEPTION
+    )
+
+
+# passlib is only imported inside the worker processes
+def _hash(password: str) -> str:
+    from passlib.hash import bcrypt
+
+    return bcrypt.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    from passlib.hash import bcrypt
+
+    try:
+        return bcrypt.verify(plain_password, hashed_password)
+    except (TypeError, ValueError):
+        return False
+
+
+async def hash_password(password: str) -> str:
+    return await hash_pool.run(_hash, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await hash_pool.run(_verify, plain_password, hashed_password)
@@ -0,0 +1,124 @@
+import asyncio
+import re
+import time
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
+from cryptography.x509 import load_pem_x509_certificate
+from fastapi import HTTPException
+
+from app.config import settings
+from app.http_client import fetch
+
+JWKS_URI = "https://login.microsoftonline.com/common/discovery/v2.0/keys"
+
+MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+def get_max_age(headers, default: int) -> int:
+    cache_control = headers.get("cache-control", "")
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0
+    match = MAX_AGE_RE.search(cache_control)
+    if match:
+        return int(match.group(1))
+    return default
+
+
+def load_x5c_key(x5c: str) -> RSAPublicKey:
+    cert_str = f"-----BEGIN CERTIFICATE-----\n{x5c}\n-----END CERTIFICATE-----\n"
+    cert_obj = load_pem_x509_certificate(cert_str.encode(encoding="ascii"), default_backend())
+    return cert_obj.public_key()
+
+
+class DiscoveryCache:
+    """OPENID DISCOVERY DOCUMENTS, KEPT FOR THE PROVIDER'S CACHE-CONTROL MAX-AGE"""
+
+    def __init__(self, default_ttl: int):
+        self.default_ttl = default_ttl
+        self._documents: dict[str, tuple[dict, float]] = {}
+        self._lock = asyncio.Lock()
+
+    def _cached(self, url: str) -> dict | None:
+        entry = self._documents.get(url)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+        return None
+
+    async def get(self, url: str) -> dict:
+        document = self._cached(url)
+        if document is not None:
+            return document
+
+        async with self._lock:
+            # another request may have fetched it while we were waiting
+            document = self._cached(url)
+            if document is not None:
+                return document
+            response = await fetch("GET", url)
+            document = response.json()
+            ttl = get_max_age(response.headers, self.default_ttl)
+            self._documents[url] = (document, time.monotonic() + ttl)
+        return document
+
+
+class JWKSCache:
+    """PARSED SIGNING KEYS BY KID, REFRESHED ON EXPIRY OR (RATE LIMITED) ON AN UNKNOWN KID"""
+
+    def __init__(self, url: str, params: dict, default_ttl: int, min_refresh_interval: int):
+        self.url = url
+        self.params = params
+        self.default_ttl = default_ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._keys: dict[str, RSAPublicKey] = {}
+        self._expires_at = 0.0
+        self._refreshed_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def refresh(self, force: bool = False) -> None:
+        started_at = time.monotonic()
+        async with self._lock:
+            if self._refreshed_at >= started_at:
+                return
+            if not force and started_at - self._refreshed_at < self.min_refresh_interval \
+                    and started_at < self._expires_at:
+                return
+            response = await fetch("GET", self.url, params=self.params)
+            keys = dict()
+            for key in response.json()["keys"]:
+                if key.get("kid") and key.get("x5c"):
+                    keys[key["kid"]] = load_x5c_key(key["x5c"][0])
+            self._keys = keys
+            self._refreshed_at = time.monotonic()
+            self._expires_at = self._refreshed_at + get_max_age(response.headers, self.default_ttl)
+
+    async def get_key(self, kid: str) -> RSAPublicKey | None:
+        if time.monotonic() >= self._expires_at:
+            await self.refresh(force=True)
+        key = self._keys.get(kid)
+        if key is None:
+            # keys may have been rotated, refresh() limits how often we ask
+            await self.refresh()
+            key = self._keys.get(kid)
+        return key
+
+
+discovery_cache = DiscoveryCache(default_ttl=settings.oidc_cache_default_ttl)
+jwks_cache = JWKSCache(
+    url=JWKS_URI,
+    params={"appid": settings.azure_client_id},
+    default_ttl=settings.oidc_cache_default_ttl,
+    min_refresh_interval=settings.jwks_min_refresh_interval
+    )
+
+
+async def warm_up() -> None:
+    """PRE-FETCH PROVIDER DOCUMENTS SO THE FIRST SSO LOGIN DOESN'T PAY FOR THEM"""
+    try:
+        await asyncio.gather(
+            discovery_cache.get(settings.google_discovery_url),
+            jwks_cache.refresh(force=True)
+            )
+    except HTTPException:
+        # the provider is unreachable right now, the first login will retry
+        pass
@@ -0,0 +1,261 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from dataclasses import (
+    dataclass,
+    field
+    )
+from email.message import EmailMessage
+
+from app.config import settings
+from app.smtp_stub import SMTPStubServer
+from app.user.smtp_pool import SMTPSessionPool
+
+
+@dataclass
+class OutboxMessage:
+    recipients: list[str]
+    body: str
+    subject: str = field(default_factory=lambda: settings.mail_subject_line)
+    attempts: int = 0
+    # time.monotonic() before which a retry is not sent again
+    not_before: float = 0.0
+
+    def as_email(self) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = f"{settings.mail_from_name} <{settings.mail_from}>"
+        message["To"] = ", ".join(self.recipients)
+        message["Subject"] = self.subject
+        message.set_content(self.body)
+        return message
+
+
+class SMTPSender:
+    """SENDS A BATCH OVER ONE POOLED SMTP SESSION, SESSIONS OUTLIVE THE BATCH"""
+
+    def __init__(self, pool_size: int = 1, **smtp_options):
+        self.pool = SMTPSessionPool(
+            size=pool_size,
+            noop_interval=settings.smtp_noop_interval,
+            max_messages_per_session=settings.smtp_session_max_messages,
+            **smtp_options
+            )
+
+    @classmethod
+    def from_settings(cls) -> "SMTPSender":
+        return cls(
+            pool_size=settings.smtp_pool_size,
+            hostname=settings.mail_server,
+            port=settings.mail_port,
+            username=settings.mail_username if settings.use_credentials else None,
+            password=settings.mail_password if settings.use_credentials else None,
+            use_tls=settings.mail_ssl,
+            start_tls=settings.mail_tls,
+            validate_certs=settings.validate_credentials,
+            timeout=settings.smtp_timeout
+            )
+
+    async def send_batch(self, messages: list[OutboxMessage]) -> list[OutboxMessage]:
+        """SEND THE BATCH, RETURNS THE MESSAGES THAT WERE NOT ACCEPTED"""
+        import aiosmtplib
+
+        failed = []
+        async with self.pool.session() as session:
+            for index, message in enumerate(messages):
+                try:
+                    await self.pool.send(session, message.as_email())
+                except (aiosmtplib.SMTPServerDisconnected, OSError):
+                    # even a fresh session was dropped, the rest waits for a retry
+                    session.broken = True
+                    failed.extend(messages[index:])
+                    break
+                except aiosmtplib.SMTPException:
+                    failed.append(message)
+        return failed
+
+    async def close(self) -> None:
+        await self.pool.close()
+
+    def stats(self) -> dict:
+        return self.pool.stats()
+
+
+class EmailOutbox:
+    """IN-MEMORY QUEUE OF OUTGOING MAIL, DRAINED IN BATCHES BY BACKGROUND WORKERS
+
+    requests only enqueue; a failed message goes back on the queue with an
+    exponential backoff deadline until max_attempts is reached, the queue is
+    ordered by that deadline so mail that is due never waits behind a retry
+    """
+
+    def __init__(
+            self,
+            max_size: int,
+            batch_size: int,
+            max_attempts: int,
+            retry_base_delay: float,
+            retry_max_delay: float,
+            workers: int = 1
+            ):
+        self.max_size = max_size
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.sender: SMTPSender | None = None
+        self.stub_server: SMTPStubServer | None = None
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.dropped = 0
+        self.batches = 0
+        # (not_before, sequence, message) heap, the sequence keeps equal deadlines in FIFO order
+        self._queue: list[tuple[float, int, OutboxMessage]] = []
+        self._sequence = itertools.count()
+        self._waiting_retry = 0
+        # queued plus in flight, drain() waits for it to reach 0
+        self._unfinished = 0
+        self._new_mail = asyncio.Event()
+        self._all_done = asyncio.Event()
+        self._all_done.set()
+        self._workers: list[asyncio.Task] = []
+
+    def enqueue(self, recipients: list[str], body: str) -> bool:
+        """PUT A MESSAGE ON THE QUEUE WITHOUT WAITING, False WHEN IT HAD TO BE DROPPED"""
+        return self._put(OutboxMessage(recipients=list(recipients), body=body))
+
+    def _put(self, message: OutboxMessage) -> bool:
+        # max_size bounds new mail only, a retry was accepted already and is never dropped
+        if message.attempts == 0:
+            if len(self._queue) - self._waiting_retry >= self.max_size:
+                self.dropped += 1
+                return False
+            message.not_before = time.monotonic()
+        else:
+            self._waiting_retry += 1
+        heapq.heappush(self._queue, (message.not_before, next(self._sequence), message))
+        self._unfinished += 1
+        self._all_done.clear()
+        self._new_mail.set()
+        return True
+
+    def _take(self) -> OutboxMessage:
+        _, _, message = heapq.heappop(self._queue)
+        if message.attempts:
+            self._waiting_retry -= 1
+        return message
+
+    def _schedule_retry(self, message: OutboxMessage) -> None:
+        message.attempts += 1
+        if message.attempts >= self.max_attempts:
+            self.failed += 1
+            return
+        self.retried += 1
+        delay = min(self.retry_base_delay * 2 ** (message.attempts - 1), self.retry_max_delay)
+        # jitter keeps a whole failed batch from coming back at the same moment
+        message.not_before = time.monotonic() + delay * random.uniform(0.5, 1.0)
+        self._put(message)
+
+    def _finish(self, count: int) -> None:
+        self._unfinished -= count
+        if not self._unfinished:
+            self._all_done.set()
+
+    def _is_due(self) -> bool:
+        return bool(self._queue) and self._queue[0][0] <= time.monotonic()
+
+    async def _next_batch(self) -> list[OutboxMessage]:
+        """DUE MESSAGES ONLY, WAITS FOR THE EARLIEST DEADLINE OR NEW MAIL, WHICHEVER COMES FIRST"""
+        while not self._is_due():
+            self._new_mail.clear()
+            timeout = self._queue[0][0] - time.monotonic() if self._queue else None
+            try:
+                await asyncio.wait_for(self._new_mail.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        batch = [self._take()]
+        while len(batch) < self.batch_size and self._is_due():
+            batch.append(self._take())
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                failed = await self.sender.send_batch(batch)
+            except Exception:
+                # connect, STARTTLS or login failed, or the server timed out; the
+                # backoff deadlines give it time to come back without parking the worker
+                failed = batch
+            self.batches += 1
+            self.sent += len(batch) - len(failed)
+            # retries are queued before the batch is finished, drain() never sees a gap
+            for message in failed:
+                self._schedule_retry(message)
+            self._finish(len(batch))
+
+    async def start(self, sender: SMTPSender | None = None) -> None:
+        if self._workers:
+            return
+        if sender is None:
+            sender = await self._create_sender()
+        self.sender = sender
+        # each worker holds at most one pooled session while it sends a batch
+        self._workers = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def _create_sender(self) -> SMTPSender:
+        if settings.mail_backend != "stub":
+            return SMTPSender.from_settings()
+        self.stub_server = SMTPStubServer()
+        await self.stub_server.start()
+        return SMTPSender(
+            pool_size=settings.smtp_pool_size,
+            hostname=self.stub_server.host,
+            port=self.stub_server.port,
+            timeout=settings.smtp_timeout
+            )
+
+    async def drain(self, timeout: float | None = None) -> bool:
+        """WAIT UNTIL EVERY QUEUED MESSAGE IS SENT OR GIVEN UP, PENDING RETRIES INCLUDED"""
+        try:
+            await asyncio.wait_for(self._all_done.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def stop(self) -> None:
+        if not self._workers:
+            return
+        await self.drain(settings.outbox_drain_timeout)
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        await self.sender.close()
+        if self.stub_server is not None:
+            await self.stub_server.stop()
+            self.stub_server = None
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self._queue) - self._waiting_retry,
+            "waiting_retry": self._waiting_retry,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            }
+
+
+email_outbox = EmailOutbox(
+    max_size=settings.outbox_max_size,
+    batch_size=settings.outbox_batch_size,
+    max_attempts=settings.outbox_max_attempts,
+    retry_base_delay=settings.outbox_retry_base_delay,
+    retry_max_delay=settings.outbox_retry_max_delay,
+    workers=settings.smtp_pool_size
+    )
@@ -1,6 +1,6 @@
-import aiofiles as aiofiles
 from fastapi import (
     APIRouter,
+    BackgroundTasks,
     Depends,
     status,
     UploadFile,
@@ -9,8 +9,14 @@ from fastapi import (
 from fastapi.responses import JSONResponse
 
 from app.config import settings
+from app.responses import ModelResponse
 from app.user import schemas
 from app.user.auth_service import get_current_user
+from app.user.avatars import (
+    discard_staged_avatar,
+    remove_avatar_if_unused,
+    stage_avatar
+    )
 from app.user.tokenizator import JWTBearer, create_bearer_token
 from app.user.user_service import UserService
 
@@ -22,7 +28,7 @@ user_router = APIRouter(
 
 @user_router.get("/me", response_model=schemas.User, dependencies=[Depends(JWTBearer())])
 async def get_my_profile(user: schemas.User = Depends(get_current_user)):
-    return user
+    return ModelResponse(user)
 
 
 @user_router.put("/me/update", response_model=schemas.User, dependencies=[Depends(JWTBearer())])
@@ -30,25 +36,35 @@ async def update_user_profile(
         user_data: schemas.UserUpdate,
         user: schemas.User = Depends(get_current_user)
         ):
-    return await UserService(user.id).update_user(user_data)
+    return ModelResponse(await UserService(user.id).update_user(user_data))
 
 
 @user_router.put("/me/update-avatar", response_model=schemas.User, dependencies=[Depends(JWTBearer())])
 async def edit_avatar(
+        background_tasks: BackgroundTasks,
         avatar: UploadFile = File(...),
         user: schemas.User = Depends(get_current_user)
         ):
-    service = UserService(user.id)
-    file_name = service.get_file_name(avatar.filename)
-    async with aiofiles.open(file_name, 'wb') as out_file:
-        content = await avatar.read()
-        await out_file.write(content)
-    return await service.update_avatar(file_name)
+    tmp_path, avatar_path = await stage_avatar(avatar)
+    try:
+        updated_user, old_avatar = await UserService(user.id).update_avatar(tmp_path, avatar_path)
+    except BaseException:
+        await discard_staged_avatar(tmp_path)
+        await remove_avatar_if_unused(avatar_path)
+        raise
+    if old_avatar != avatar_path:
+        background_tasks.add_task(remove_avatar_if_unused, old_avatar)
+    return ModelResponse(updated_user)
 
 
 @user_router.delete("/delete", dependencies=[Depends(JWTBearer())])
-async def delete_user(user: schemas.User = Depends(get_current_user)):
-    await UserService(user.id).delete_user_()
+async def delete_user(
+        background_tasks: BackgroundTasks,
+        user: schemas.User = Depends(get_current_user)
+        ):
+    key_paths, avatar = await UserService(user.id).delete_user_()
+    # rows are gone at this point, stored files are purged after the response
+    background_tasks.add_task(UserService.purge_user_files, key_paths, avatar)
     return JSONResponse(
         {
             "msg": status.HTTP_204_NO_CONTENT,
@@ -0,0 +1,155 @@
+import asyncio
+import statistics
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from email.message import EmailMessage
+from typing import AsyncIterator
+
+
+class SMTPSession:
+    def __init__(self, smtp):
+        self.smtp = smtp
+        self.last_used = time.monotonic()
+        self.messages = 0
+        # set when the connection can not be trusted any more, the pool closes it on release
+        self.broken = False
+
+
+class SMTPSessionPool:
+    """LONG-LIVED AUTHENTICATED SMTP SESSIONS, REUSED ACROSS MESSAGES
+
+    connect + STARTTLS + login happen once per session instead of once per
+    message; a session idle for longer than noop_interval is checked with NOOP
+    before reuse, and one the server dropped is reconnected transparently
+    """
+
+    def __init__(self, size: int, noop_interval: float, max_messages_per_session: int, **smtp_options):
+        self.size = size
+        self.noop_interval = noop_interval
+        self.max_messages_per_session = max_messages_per_session
+        self.smtp_options = smtp_options
+        self.connects = 0
+        self.reconnects = 0
+        self.health_checks = 0
+        self.failed_health_checks = 0
+        self.sent = 0
+        self.send_errors = 0
+        self._idle: list[SMTPSession] = []
+        self._in_use = 0
+        self._semaphore: asyncio.Semaphore | None = None
+        self._latencies: deque[float] = deque(maxlen=1024)
+
+    async def _connect(self) -> SMTPSession:
+        import aiosmtplib
+
+        smtp = aiosmtplib.SMTP(**self.smtp_options)
+        # with start_tls and username set this is connect, STARTTLS and login in one go
+        await smtp.connect()
+        self.connects += 1
+        return SMTPSession(smtp)
+
+    @staticmethod
+    def _discard(session: SMTPSession) -> None:
+        if session.smtp.is_connected:
+            session.smtp.close()
+
+    async def _is_healthy(self, session: SMTPSession) -> bool:
+        import aiosmtplib
+
+        if not session.smtp.is_connected or session.messages >= self.max_messages_per_session:
+            return False
+        if time.monotonic() - session.last_used < self.noop_interval:
+            return True
+        self.health_checks += 1
+        try:
+            await session.smtp.noop()
+        except (aiosmtplib.SMTPException, OSError):
+            self.failed_health_checks += 1
+            return False
+        return True
+
+    async def _checkout(self) -> SMTPSession:
+        while self._idle:
+            # most recently used first, it is the most likely to be alive
+            session = self._idle.pop()
+            if await self._is_healthy(session):
+                return session
+            self._discard(session)
+        return await self._connect()
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[SMTPSession]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.size)
+        async with self._semaphore:
+            session = await self._checkout()
+            self._in_use += 1
+            try:
+                yield session
+            except BaseException:
+                session.broken = True
+                raise
+            finally:
+                self._in_use -= 1
+                if session.broken:
+                    self._discard(session)
+                else:
+                    session.last_used = time.monotonic()
+                    self._idle.append(session)
+
+    async def send(self, session: SMTPSession, message: EmailMessage) -> None:
+        """SEND ON THE SESSION, A SESSION THE SERVER HAS DROPPED IS RECONNECTED ONCE"""
+        import aiosmtplib
+
+        started = time.perf_counter()
+        try:
+            try:
+                await session.smtp.send_message(message)
+            except aiosmtplib.SMTPServerDisconnected:
+                self._discard(session)
+                session.broken = True
+                self.reconnects += 1
+                session.smtp = (await self._connect()).smtp
+                session.broken = False
+                session.messages = 0
+                await session.smtp.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            session.broken = True
+            self.send_errors += 1
+            raise
+        except (aiosmtplib.SMTPException, OSError):
+            self.send_errors += 1
+            raise
+        session.messages += 1
+        self.sent += 1
+        self._latencies.append(time.perf_counter() - started)
+
+    async def close(self) -> None:
+        import aiosmtplib
+
+        while self._idle:
+            session = self._idle.pop()
+            try:
+                await session.smtp.quit()
+            except (aiosmtplib.SMTPException, OSError):
+                self._discard(session)
+
+    def stats(self) -> dict:
+        latencies = sorted(self._latencies)
+        return {
+            "size": self.size,
+            "idle": len(self._idle),
+            "in_use": self._in_use,
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "health_checks": self.health_checks,
+            "failed_health_checks": self.failed_health_checks,
+            "sent": self.sent,
+            "send_errors": self.send_errors,
+            "send_latency_ms": {
+                "p50": round(statistics.median(latencies) * 1000, 2) if latencies else None,
+                "p95": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2) if latencies else None,
+                "max": round(latencies[-1] * 1000, 2) if latencies else None,
+                },
+            }
@@ -6,19 +6,20 @@ from datetime import (
     )
 
 import jwt
-import requests
-from cryptography.hazmat.backends import default_backend
+from cachetools import TTLCache
 from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
-from cryptography.x509 import load_pem_x509_certificate
 from jwt import PyJWTError
 
 from app import models
 from app.config import settings
+from app.responses import prevalidated
 from app.user import schemas
 from app.user.exceptions import (
     CREDENTIALS_EXCEPTION,
     INVALID_TOKEN_EXCEPTION
     )
+from app.user.oidc_cache import jwks_cache
+from app.user.user_cache import user_cache
 
 from fastapi import (
     Request,
@@ -29,7 +30,10 @@ from fastapi.security import (
     HTTPAuthorizationCredentials
     )
 
-JWKS_URI = f"https://login.microsoftonline.com/common/discovery/v2.0/keys"
+token_claims_cache = TTLCache(
+    maxsize=settings.token_cache_size,
+    ttl=settings.token_cache_ttl
+    )
 
 
 def create_bearer_token(user_id: uuid.UUID) -> schemas.Token:
@@ -46,24 +50,53 @@ def create_bearer_token(user_id: uuid.UUID) -> schemas.Token:
     return schemas.Token(access_token=token)
 
 
-async def validate_token(token: str) -> schemas.User:
+def decode_token(token: str) -> dict | None:
+    """DECODE AND VERIFY OUR OWN JWT, REUSING RECENT VERIFICATIONS"""
+    claims = token_claims_cache.get(token)
+    if claims is not None:
+        if claims["exp"] >= time.time():
+            return claims
+        token_claims_cache.pop(token, None)
+        return None
+
     try:
-        payload = jwt.decode(
+        claims = jwt.decode(
             token,
             settings.jwt_secret,
             algorithms=[settings.jwt_algorithm]
             )
     except PyJWTError:
+        return None
+    token_claims_cache[token] = claims
+    return claims
+
+
+async def get_user(user_id: uuid.UUID) -> schemas.User:
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    generation = user_cache.generation
+    user_row = await models.User.objects.get_or_none(id=user_id)
+    if not user_row:
         raise CREDENTIALS_EXCEPTION
+    user = prevalidated(schemas.User, user_row)
+    user_cache.set(user, generation)
+    return user
 
-    user = await models.User.objects.get_or_none(id=uuid.UUID(payload["sub"]))
-    if not user:
+
+async def validate_token(token: str) -> schemas.User:
+    claims = decode_token(token)
+    if claims is None:
         raise CREDENTIALS_EXCEPTION
-    return schemas.User.parse_obj(user)
+    return await get_user(uuid.UUID(claims["sub"]))
 
 
 async def decode_azure_id_token(token: str) -> dict:
-    kid = jwt.get_unverified_header(token)["kid"]
+    try:
+        kid = jwt.get_unverified_header(token)["kid"]
+    except (PyJWTError, KeyError):
+        raise INVALID_TOKEN_EXCEPTION
     ms_pub_key = await get_public_key(kid)
     try:
         user_info = jwt.decode(
@@ -81,23 +114,9 @@ async def decode_azure_id_token(token: str) -> dict:
 
 
 async def get_public_key(kid: str) -> RSAPublicKey:
-    keys = requests.get(JWKS_URI, params={
-        "appid": settings.azure_client_id
-        }).json()["keys"]
-
-    key_ = None
-    for key in keys:
-        if key["kid"] == kid:
-            key_ = key['x5c'][0]
-
-    pemstart = "-----BEGIN CERTIFICATE-----\n"
-    pemend = "\n-----END CERTIFICATE-----\n"
-
-    cert_str = pemstart + key_ + pemend
-    cert_bytes = cert_str.encode(encoding="ascii")
-
-    cert_obj = load_pem_x509_certificate(cert_bytes, default_backend())
-    public_key = cert_obj.public_key()
+    public_key = await jwks_cache.get_key(kid)
+    if public_key is None:
+        raise INVALID_TOKEN_EXCEPTION
     return public_key
 
 
@@ -114,22 +133,11 @@ class JWTBearer(HTTPBearer):
         if credentials:
             if not credentials.scheme == "Bearer":
                 raise HTTPException(status_code=403, detail="Invalid authentication scheme.")
-            if not self.verify_token(credentials.credentials):
+            claims = decode_token(credentials.credentials)
+            if claims is None:
                 raise HTTPException(status_code=403, detail="Invalid token or expired token.")
+            # verified claims are shared with get_current_user for the rest of the request
+            request.state.token_claims = claims
             return credentials.credentials
         else:
             raise HTTPException(status_code=403, detail="Invalid authorization code.")
-
-    @staticmethod
-    def verify_token(token: str) -> bool:
-        try:
-            payload = jwt.decode(
-                token,
-                settings.jwt_secret,
-                algorithms=[settings.jwt_algorithm]
-                )
-        except PyJWTError:
-            return False
-        if payload.get('exp') >= time.time():
-            return True
-        return False
@@ -0,0 +1,65 @@
+import uuid
+
+from cachetools import TTLCache
+
+from app.config import settings
+from app.user import schemas
+
+
+class UserCache:
+    """PROCESS-LOCAL TTL/LRU CACHE OF AUTHENTICATED USERS"""
+
+    def __init__(self, maxsize: int, ttl: int):
+        self._users = TTLCache(maxsize=maxsize, ttl=ttl)
+        # bumped on every invalidation, so a read that started before a write
+        # can't put the stale row back into the cache
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(user_id: uuid.UUID | str) -> uuid.UUID:
+        if isinstance(user_id, uuid.UUID):
+            return user_id
+        return uuid.UUID(str(user_id))
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, user_id: uuid.UUID) -> schemas.User | None:
+        user = self._users.get(self._key(user_id))
+        if user is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return user
+
+    def set(self, user: schemas.User, generation: int) -> None:
+        if generation == self._generation:
+            self._users[self._key(user.id)] = user
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        self._generation += 1
+        self._users.pop(self._key(user_id), None)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._users.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._users),
+            "maxsize": self._users.maxsize,
+            "ttl": self._users.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0
+            }
+
+
+user_cache = UserCache(
+    maxsize=settings.user_cache_size,
+    ttl=settings.user_cache_ttl
+    )
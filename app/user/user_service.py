@@ -1,45 +1,34 @@
-import os
 import uuid
 
 import jwt
-from fastapi_mail import (
-    MessageSchema,
-    ConnectionConfig,
-    FastMail
+import sqlalchemy
+from fastapi import (
+    HTTPException,
+    status
     )
 from jwt import PyJWTError
 
 from app import models
-from app.company.service import CompanyService
 from app.config import settings
+from app.db import (
+    database,
+    update_returning
+    )
+from app.responses import prevalidated
+from app.ssh.ssh_keys import SSHService
+from app.ssh.storage import get_storage
 from app.user import schemas
+from app.user.avatars import (
+    lock_avatar,
+    publish_avatar,
+    remove_avatar_if_unused
+    )
 from app.user.exceptions import CREDENTIALS_EXCEPTION
+from app.user.outbox import email_outbox
+from app.user.user_cache import user_cache
 
 
 class UserService:
-    config = ConnectionConfig(
-        MAIL_USERNAME=settings.mail_username,
-        MAIL_PASSWORD=settings.mail_password,
-        MAIL_FROM=settings.mail_from,
-        MAIL_PORT=settings.mail_port,
-        MAIL_SERVER=settings.mail_server,
-        MAIL_FROM_NAME=settings.mail_from_name,
-        USE_CREDENTIALS=settings.use_credentials,
-        VALIDATE_CERTS=settings.validate_credentials,
-        MAIL_STARTTLS=True,
-        MAIL_SSL_TLS=False,
-
-        )
-
-    fastapi_mail = FastMail(config=config)
-
-    @staticmethod
-    def get_file_name(file_name: str) -> str:
-        """CREATE FILENAME FOR USERS AVATARS"""
-        ext = file_name.strip().split(".")[1]
-        file_name = f'{uuid.uuid4()}.{ext}'
-        return os.path.join('avatars/', file_name)
-
     @staticmethod
     async def get_user_by_email(email: str) -> models.User:
         user = await models.User.objects.get_or_none(email=email)
@@ -48,15 +37,9 @@ class UserService:
         return user
 
     @staticmethod
-    async def send_email(email: schemas.EmailSchema, message: str) -> None:
-        """SEND MAIL"""
-        message = MessageSchema(
-            subject_line=settings.mail_subject_line,
-            recipients=email,
-            body=message,
-            subtype='plain'
-            )
-        await UserService.fastapi_mail.send_message(message)
+    async def send_email(email: list[str], message: str) -> None:
+        """QUEUE MAIL, THE OUTBOX WORKER SENDS IT IN THE BACKGROUND"""
+        email_outbox.enqueue(email, message)
 
     @staticmethod
     async def verify_user_email(token: str) -> None:
@@ -68,43 +51,83 @@ class UserService:
                 )
         except PyJWTError:
             raise CREDENTIALS_EXCEPTION
-        await models.User.objects.filter(id=uuid.UUID(payload["sub"])).update(is_email_verif=True)
+        user_id = uuid.UUID(payload["sub"])
+        await models.User.objects.filter(id=user_id).update(is_email_verif=True)
+        user_cache.invalidate(user_id)
 
     def __init__(self, user_id: uuid.UUID = None):
         self.user_id = user_id
 
     async def update_user(self, user_data: schemas.UserUpdate) -> schemas.User:
         new_data = dict()
-        is_email_verif = True
 
         for key, value in user_data.dict().items():
             if value:
                 new_data[key] = value
-        try:
-            if new_data["email"]:
-                is_email_verif = False
-        except KeyError:
-            pass
-
-        await models.User.objects.filter(id=self.user_id).update(
-            **new_data,
-            is_email_verif=is_email_verif
-            )
-        user = await models.User.objects.filter(id=self.user_id).first()
-        return schemas.User.parse_obj(user)
-
-    async def update_avatar(self, avatar_path: str) -> schemas.User:
-        await models.User.objects.filter(id=self.user_id).update(avatar=avatar_path)
-        user = await models.User.objects.filter(id=self.user_id).first()
-        return schemas.User.parse_obj(user)
-
-    async def delete_user_(self) -> None:
-        # TODO: make cascade delete
-        id_list = []
-        companies = await CompanyService(user_id=self.user_id).get_list_companies()
-        for company in companies:
-            id_list.append(company.id)
-        for id_ in id_list:
-            await CompanyService(user_id=self.user_id, company_id=id_).delete_company()
-        id_list.clear()
-        await models.User.objects.clear(id=self.user_id)
+        # a new address has to be verified again
+        if "email" in new_data:
+            new_data["is_email_verif"] = False
+
+        user = await update_returning(models.User, new_data, id=self.user_id)
+        user_cache.invalidate(self.user_id)
+        if user is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+        return prevalidated(schemas.User, user)
+
+    async def update_avatar(self, tmp_path: str, avatar_path: str) -> tuple[schemas.User, str | None]:
+        """PUBLISH A STAGED AVATAR AND SET IT, RETURNS THE USER AND THE AVATAR IT REPLACED"""
+        users = models.User.Meta.table
+        async with database.transaction():
+            await lock_avatar(avatar_path)
+            await publish_avatar(tmp_path, avatar_path)
+            old_avatar = await database.fetch_val(
+                sqlalchemy.select(users.c.avatar).where(users.c.id == self.user_id).with_for_update()
+                )
+            user = await update_returning(models.User, {"avatar": avatar_path}, id=self.user_id)
+        user_cache.invalidate(self.user_id)
+        if user is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+        return prevalidated(schemas.User, user), old_avatar
+
+    async def delete_user_(self) -> tuple[list[str], str | None]:
+        """DELETE THE USER'S WHOLE SUBTREE IN ONE TRANSACTION
+
+        returns what has to be purged from storage afterwards:
+        the ssh key object paths and the avatar file
+        """
+        users = models.User.Meta.table
+        companies = models.Company.Meta.table
+        contacts = models.Contact.Meta.table
+        projects = models.Project.Meta.table
+        ssh_pairs = models.SSHPair.Meta.table
+
+        owned_companies = sqlalchemy.select(companies.c.id).where(companies.c.owner == self.user_id)
+        async with database.transaction():
+            await database.execute(contacts.delete().where(contacts.c.company.in_(owned_companies)))
+            await database.execute(projects.delete().where(projects.c.company.in_(owned_companies)))
+            await database.execute(companies.delete().where(companies.c.owner == self.user_id))
+            ssh_rows = await database.fetch_all(
+                ssh_pairs.delete().where(
+                    ssh_pairs.c.owner_id == self.user_id
+                    ).returning(ssh_pairs.c.owner_name, ssh_pairs.c.uuid_)
+                )
+            user_row = await database.fetch_one(
+                users.delete().where(users.c.id == self.user_id).returning(users.c.avatar)
+                )
+        user_cache.invalidate(self.user_id)
+
+        key_paths = [
+            SSHService.get_key_path(row["owner_name"], row["uuid_"], type_)
+            for row in ssh_rows
+            for type_ in ('public', 'private')
+            ]
+        avatar = user_row["avatar"] if user_row else None
+        return key_paths, avatar
+
+    @staticmethod
+    async def purge_user_files(key_paths: list[str], avatar: str | None) -> None:
+        """BACKGROUND PART OF delete_user_: REMOVE STORED OBJECTS OF A DELETED USER"""
+        if key_paths:
+            await get_storage().delete_many(key_paths)
+        # identical avatars share one file
+        await remove_avatar_if_unused(avatar)
@@ -0,0 +1,64 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    Any,
+    Callable
+    )
+
+from fastapi import HTTPException
+
+
+class WorkerPool:
+    """BOUNDED PROCESS POOL FOR CPU-BOUND WORK CALLED FROM ASYNC HANDLERS"""
+
+    def __init__(
+            self,
+            max_workers: int,
+            queue_depth: int,
+            timeout: float,
+            busy_exception: HTTPException
+            ):
+        self.max_workers = max_workers
+        self.max_pending = max_workers + queue_depth
+        self.timeout = timeout
+        self.busy_exception = busy_exception
+        self.pending = 0
+        self.rejected = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn instead of fork: the event loop process has live threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+                )
+        return self._executor
+
+    def _release(self, loop: asyncio.AbstractEventLoop) -> None:
+        loop.call_soon_threadsafe(self._decrement)
+
+    def _decrement(self) -> None:
+        self.pending -= 1
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        # reject straight away instead of stacking jobs behind a full queue
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise self.busy_exception
+
+        loop = asyncio.get_running_loop()
+        job = self._get_executor().submit(func, *args)
+        self.pending += 1
+        # the slot is freed when the job really finishes, not when we stop waiting
+        job.add_done_callback(lambda _: self._release(loop))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(job), self.timeout)
+        except asyncio.TimeoutError:
+            raise self.busy_exception
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,62 @@
+"""
+Import time budget for app.main, measured with `python -X importtime`.
+
+    python benchmarks/import_time.py --budget-ms 800
+
+Exits with status 1 when importing app.main takes longer than the budget, and
+prints the slowest modules so a regression is easy to pin down. Importing the
+app must not touch the network, the database or object storage. If it does,
+the import either fails here or blows the budget.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+IMPORTTIME_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module: str) -> list[tuple[str, int, int]]:
+    """(module, self us, cumulative us) FOR EVERY MODULE IMPORTED BY `import module`"""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, cwd=ROOT
+        )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(f"importing {module} failed")
+    timings = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            timings.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", 800)))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    # best of N, the first run also pays for cold .pyc compilation
+    best = min(runs, key=lambda timings: timings[-1][2])
+    total_ms = best[-1][2] / 1000
+
+    print(f"import {args.module}: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms, best of {args.runs})")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, self_us, cumulative_us in sorted(best, key=lambda t: t[2], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+    if total_ms > args.budget_ms:
+        raise SystemExit(f"import time budget exceeded by {total_ms - args.budget_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Email throughput of the outbox against the in-process SMTP stub, no network needed.
+
+    python benchmarks/outbox_throughput.py --messages 500 --latency-ms 2 --batch-sizes 1 10 50
+
+"inline" sends every message on its own SMTP session the way the request path
+used to (one connection and a full handshake per message). The outbox rows
+enqueue everything at once and time how long the workers need to drain it for
+every batch size. Their sessions come from the SMTP session pool and stay
+open between batches, so the session count stays at --pool-size. --latency-ms
+is added to each stub reply to imitate a remote server. app.config still reads
+the usual environment variables on import.
+"""
+import argparse
+import asyncio
+import time
+
+import aiosmtplib
+
+from app.smtp_stub import SMTPStubServer
+from app.user.outbox import (
+    EmailOutbox,
+    OutboxMessage,
+    SMTPSender
+    )
+
+
+def make_message(i: int) -> OutboxMessage:
+    return OutboxMessage(recipients=[f"user{i}@example.com"], body=f"Welcome to platops dashboard #{i}", subject="bench")
+
+
+async def run_inline(server: SMTPStubServer, count: int) -> float:
+    started = time.perf_counter()
+    for i in range(count):
+        smtp = aiosmtplib.SMTP(hostname=server.host, port=server.port, timeout=10)
+        await smtp.connect()
+        await smtp.send_message(make_message(i).as_email())
+        await smtp.quit()
+    return time.perf_counter() - started
+
+
+async def run_outbox(server: SMTPStubServer, count: int, batch_size: int, pool_size: int) -> tuple[float, float]:
+    sender = SMTPSender(pool_size=pool_size, hostname=server.host, port=server.port, timeout=10)
+    outbox = EmailOutbox(
+        max_size=count,
+        batch_size=batch_size,
+        max_attempts=3,
+        retry_base_delay=0.1,
+        retry_max_delay=1.0,
+        workers=pool_size
+        )
+    await outbox.start(sender)
+    started = time.perf_counter()
+    for i in range(count):
+        outbox.enqueue([f"user{i}@example.com"], f"Welcome to platops dashboard #{i}")
+    enqueued = time.perf_counter()
+    await outbox.drain()
+    finished = time.perf_counter()
+    await outbox.stop()
+    if outbox.sent != count:
+        raise SystemExit(f"outbox sent {outbox.sent} of {count} messages: {outbox.stats()}")
+    return (enqueued - started) / count, finished - started
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--pool-size", type=int, default=2)
+    args = parser.parse_args()
+
+    server = SMTPStubServer(latency=args.latency_ms / 1000)
+    await server.start()
+    try:
+        print(f"{'mode':<16} {'enqueue us/msg':>15} {'msgs/s':>9} {'smtp sessions':>14}")
+        connections = server.connections
+        elapsed = await run_inline(server, args.messages)
+        print(f"{'inline':<16} {'-':>15} {args.messages / elapsed:>9.0f} {server.connections - connections:>14}")
+        for batch_size in args.batch_sizes:
+            connections = server.connections
+            enqueue_cost, elapsed = await run_outbox(server, args.messages, batch_size, args.pool_size)
+            label = f"outbox batch={batch_size}"
+            print(
+                f"{label:<16} {enqueue_cost * 1_000_000:>15.1f} {args.messages / elapsed:>9.0f} "
+                f"{server.connections - connections:>14}"
+                )
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+"""
+Per-row cost of rendering a contacts page, before and after the fast response path.
+
+    python benchmarks/serialization.py --rows 50 200 1000
+
+"before" is what a list endpoint used to do: parse_obj on every ormar row, then
+FastAPI validates the result again against response_model, runs jsonable_encoder
+and renders it with the stdlib json encoder. "after" is prevalidated() plus
+ModelResponse, which renders the page with orjson and nothing else.
+
+No database is needed, the rows are built in memory. app.config still reads the
+usual environment variables on import.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import (
+    APIRoute,
+    serialize_response
+    )
+
+from app import models
+from app.contact import schemas
+from app.pagination import Page
+from app.responses import (
+    ModelResponse,
+    prevalidated
+    )
+
+
+def make_rows(count: int) -> list[models.Contact]:
+    return [
+        models.Contact(
+            id=uuid.uuid4(),
+            type="billing",
+            name=f"contact {i}",
+            email=f"contact{i}@example.com",
+            phone_num="+380000000000",
+            address_1="street 1",
+            address_2="apartment 2",
+            city="Kyiv",
+            state="Kyiv",
+            country="Ukraine",
+            zip="01001"
+            )
+        for i in range(count)
+        ]
+
+
+async def render_before(rows: list[models.Contact], route: APIRoute) -> bytes:
+    page = Page[schemas.Contact](items=[schemas.Contact.parse_obj(row) for row in rows], next_cursor=None)
+    content = await serialize_response(field=route.secure_cloned_response_field, response_content=page)
+    return JSONResponse(content).body
+
+
+async def render_after(rows: list[models.Contact], route: APIRoute) -> bytes:
+    page = Page[schemas.Contact].construct(items=[prevalidated(schemas.Contact, row) for row in rows], next_cursor=None)
+    return ModelResponse(page).body
+
+
+async def measure(render, rows: list[models.Contact], route: APIRoute, repeats: int) -> float:
+    """MEDIAN MICROSECONDS PER ROW"""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        await render(rows, route)
+        timings.append((time.perf_counter() - started) * 1_000_000 / len(rows))
+    return statistics.median(timings)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    route = APIRoute("/contacts/", endpoint=lambda: None, response_model=Page[schemas.Contact])
+    print(f"{'rows':>6} {'before us/row':>14} {'after us/row':>13} {'speedup':>8}")
+    for count in args.rows:
+        rows = make_rows(count)
+        before = await measure(render_before, rows, route, args.repeats)
+        after = await measure(render_after, rows, route, args.repeats)
+        print(f"{count:>6} {before:>14.1f} {after:>13.1f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
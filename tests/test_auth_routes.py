@@ -0,0 +1,46 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from app.http_client import (
+    close_http_client,
+    start_http_client
+    )
+from app.sso_stub import SSOStubTransport
+from app.user import schemas
+from app.user.auth_routes import auth_router
+from app.user.auth_service import AuthService
+
+
+def test_google_callback_reaches_user_provisioning(monkeypatch):
+    provisioned = []
+
+    async def auth_via_openid(self, user_data: dict) -> schemas.Token:
+        # stands in for the database insert
+        provisioned.append(user_data)
+        return schemas.Token(access_token="token")
+
+    monkeypatch.setattr(AuthService, "_AuthService__auth_via_openid", auth_via_openid)
+    app = FastAPI()
+    app.include_router(auth_router)
+
+    async def scenario() -> httpx.Response:
+        await start_http_client(transport=SSOStubTransport())
+        try:
+            async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+                return await client.get("/auth/google-callback", params={"code": "stub-code"})
+        finally:
+            await close_http_client()
+
+    response = asyncio.run(scenario())
+
+    assert response.status_code == 200
+    assert response.json()["access_token"] == "token"
+    assert provisioned[0]["email"] == "stub.user@example.com"
+
+
+def test_google_auth_client_is_built_lazily():
+    service = AuthService()
+    assert service._google_auth_client is None
+    assert service.google_auth_client is service.google_auth_client
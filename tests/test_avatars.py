@@ -0,0 +1,66 @@
+import asyncio
+import hashlib
+import io
+import os
+import time
+
+import pytest
+from fastapi import UploadFile
+
+from app.config import settings
+from app.user.avatars import (
+    remove_stale_uploads,
+    stage_avatar
+    )
+from app.user.exceptions import AVATAR_TOO_LARGE_EXCEPTION
+
+PICTURE = b"\x89PNG\r\n\x1a\n" + b"pixels" * 100
+
+
+@pytest.fixture
+def dirs(tmp_path, monkeypatch):
+    avatar_dir = tmp_path / "avatars"
+    upload_dir = tmp_path / "avatar_uploads"
+    avatar_dir.mkdir()
+    upload_dir.mkdir()
+    monkeypatch.setattr(settings, "avatar_dir", str(avatar_dir))
+    monkeypatch.setattr(settings, "avatar_upload_dir", str(upload_dir))
+    monkeypatch.setattr(settings, "avatar_chunk_size", 64)
+    return avatar_dir, upload_dir
+
+
+def test_upload_is_staged_outside_the_served_directory(dirs):
+    avatar_dir, upload_dir = dirs
+
+    tmp_path, avatar_path = asyncio.run(stage_avatar(UploadFile("me.PNG", file=io.BytesIO(PICTURE))))
+
+    assert os.path.dirname(tmp_path) == str(upload_dir)
+    assert open(tmp_path, "rb").read() == PICTURE
+    assert avatar_path == os.path.join(avatar_dir, hashlib.sha256(PICTURE).hexdigest() + ".png")
+    assert os.listdir(avatar_dir) == []
+
+
+def test_oversized_upload_leaves_nothing_behind(dirs, monkeypatch):
+    avatar_dir, upload_dir = dirs
+    monkeypatch.setattr(settings, "avatar_max_size", len(PICTURE) - 1)
+
+    with pytest.raises(type(AVATAR_TOO_LARGE_EXCEPTION)):
+        asyncio.run(stage_avatar(UploadFile("me.png", file=io.BytesIO(PICTURE))))
+
+    assert os.listdir(upload_dir) == []
+    assert os.listdir(avatar_dir) == []
+
+
+def test_only_old_uploads_are_removed_on_startup(dirs):
+    _, upload_dir = dirs
+    old = upload_dir / "old.tmp"
+    fresh = upload_dir / "fresh.tmp"
+    other = upload_dir / "keep.txt"
+    for path in (old, fresh, other):
+        path.write_bytes(b"x")
+    long_ago = time.time() - settings.avatar_upload_max_age - 60
+    os.utime(old, (long_ago, long_ago))
+    os.utime(other, (long_ago, long_ago))
+
+    assert remove_stale_uploads() == 1
+    assert sorted(os.listdir(upload_dir)) == ["fresh.tmp", "keep.txt"]
@@ -0,0 +1,67 @@
+import asyncio
+import uuid
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app import (
+    db,
+    models
+    )
+from app.contact.routes import contact_router
+from app.user import schemas
+from app.user.tokenizator import create_bearer_token
+from app.user.user_cache import user_cache
+
+
+@pytest.fixture
+def fetch_one(monkeypatch):
+    queries = []
+
+    async def fake_fetch_one(query):
+        queries.append(query)
+        return None
+
+    monkeypatch.setattr(db.database, "fetch_one", fake_fetch_one)
+    return queries
+
+
+def test_update_returning_rejects_value_outside_choices(fetch_one):
+    with pytest.raises(ValueError):
+        asyncio.run(db.update_returning(models.Contact, {"type": "bogus"}, id=uuid.uuid4()))
+    assert fetch_one == []
+
+
+def test_update_returning_passes_allowed_choice(fetch_one):
+    asyncio.run(db.update_returning(models.Contact, {"type": "billing"}, id=uuid.uuid4()))
+    assert fetch_one[0].compile().params["type"] == "billing"
+
+
+def test_update_contact_route_rejects_unknown_type(fetch_one):
+    user = schemas.User(
+        id=uuid.uuid4(),
+        email="owner@example.com",
+        first_name="Owner",
+        last_name="User",
+        avatar=None,
+        is_email_verif=True,
+        is_active=True
+        )
+    user_cache.set(user, user_cache.generation)
+    token = create_bearer_token(user.id).access_token
+    app = FastAPI()
+    app.include_router(contact_router)
+
+    async def scenario() -> httpx.Response:
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            return await client.put(
+                f"/contacts/update{uuid.uuid4()}",
+                json={"type": "bogus"},
+                headers={"Authorization": f"Bearer {token}"}
+                )
+
+    response = asyncio.run(scenario())
+
+    assert response.status_code == 422
+    assert fetch_one == []
@@ -0,0 +1,121 @@
+import asyncio
+import datetime
+import uuid
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app import db
+from app.config import settings
+from app.dashboard.schemas import DashboardDepth
+from app.dashboard.service import DashboardService
+from app.user import schemas
+
+USER = schemas.User(
+    id=uuid.uuid4(),
+    email="owner@example.com",
+    first_name="Owner",
+    last_name="User",
+    avatar=None,
+    is_email_verif=True,
+    is_active=True
+    )
+COMPANY_IDS = sorted((uuid.uuid4() for _ in range(3)), key=lambda value: value.hex)
+
+
+def company_row(id_: uuid.UUID) -> dict:
+    return {
+        "id": id_, "company_name": f"company {id_.hex[:4]}", "address_1": None, "address_2": None,
+        "city": None, "state": None, "country": None, "zip": None, "owner": USER.id
+        }
+
+
+def project_row(company: uuid.UUID, position: int) -> dict:
+    return {
+        "id": uuid.uuid4(), "name": f"project {position}", "start_date": datetime.date(2024, 1, 1),
+        "end_date": datetime.date(2024, 2, 1), "resp_person": "someone", "summary": "summary",
+        "company": company, "position": position
+        }
+
+
+def contact_row(company: uuid.UUID, position: int) -> dict:
+    return {
+        "id": uuid.uuid4(), "type": "billing", "name": "name", "email": "c@example.com",
+        "phone_num": "1", "address_1": "a", "address_2": "b", "city": "c", "state": "s",
+        "country": "x", "zip": "1", "company": company, "position": position
+        }
+
+
+@pytest.fixture
+def fetch_all(monkeypatch):
+    """ANSWERS EACH QUERY BY WHAT IT SELECTS, LIKE POSTGRES WOULD FOR COMPANY_IDS"""
+    queries = []
+
+    async def fake_fetch_all(query):
+        compiled = query.compile(dialect=postgresql.dialect())
+        sql = str(compiled)
+        queries.append(compiled)
+        shown = COMPANY_IDS[:settings.dashboard_max_companies]
+        if "count(*)" in sql:
+            # the first company has 2 projects and 1 contact, the others none
+            total = 2 if "FROM projects" in sql else 1
+            return [{"company": shown[0], "total": total}]
+        if "FROM projects" in sql:
+            return [project_row(shown[0], position) for position in (1, 2)]
+        if "FROM contacts" in sql:
+            return [contact_row(shown[0], 1)]
+        return [company_row(id_) for id_ in shown]
+
+    monkeypatch.setattr(db.database, "fetch_all", fake_fetch_all)
+    return queries
+
+
+def get_dashboard(depth: DashboardDepth):
+    return asyncio.run(DashboardService(USER).get_dashboard(depth))
+
+
+def test_companies_depth_runs_one_query(fetch_all):
+    dashboard = get_dashboard(DashboardDepth.companies)
+
+    assert len(fetch_all) == 1
+    assert dashboard.user == USER
+    assert [company.id for company in dashboard.companies] == COMPANY_IDS
+    assert all(company.project_count is None and company.projects is None for company in dashboard.companies)
+
+
+def test_counts_depth_fills_counts_only(fetch_all):
+    dashboard = get_dashboard(DashboardDepth.counts)
+
+    assert len(fetch_all) == 3
+    first, *rest = dashboard.companies
+    assert (first.project_count, first.contact_count) == (2, 1)
+    assert all((company.project_count, company.contact_count) == (0, 0) for company in rest)
+    assert all(company.projects is None for company in dashboard.companies)
+
+
+def test_full_depth_fills_counts_and_children(fetch_all):
+    dashboard = get_dashboard(DashboardDepth.full)
+
+    assert len(fetch_all) == 5
+    first, *rest = dashboard.companies
+    assert [project.name for project in first.projects] == ["project 1", "project 2"]
+    assert len(first.contacts) == 1
+    assert all(company.projects == [] and company.contacts == [] for company in rest)
+    assert all("row_number() OVER" in str(query) for query in fetch_all[3:])
+
+
+def test_child_queries_only_cover_the_shown_companies(fetch_all, monkeypatch):
+    monkeypatch.setattr(settings, "dashboard_max_companies", 2)
+
+    dashboard = get_dashboard(DashboardDepth.full)
+
+    assert [company.id for company in dashboard.companies] == COMPANY_IDS[:2]
+    companies_query, *child_queries = fetch_all
+    assert 2 in companies_query.params.values()
+    for query in child_queries:
+        sql = str(query)
+        # the IN subselect carries the same order and cap as the companies query
+        subselect = sql[sql.index("IN (SELECT companies.id"):]
+        assert "ORDER BY companies.id" in subselect
+        assert "LIMIT" in subselect
+        assert 2 in query.params.values()
@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.migrations import runner
+
+
+class FakeConnection:
+    def __init__(self, log: list[str], applied: set[int]):
+        self.log = log
+        self.applied = applied
+
+    def execution_options(self, **options):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, statement, params=None):
+        sql = " ".join(str(statement).split())
+        self.log.append(sql)
+        if sql.startswith("SELECT version FROM schema_migrations"):
+            return [(version,) for version in sorted(self.applied)]
+        if sql.startswith("INSERT INTO schema_migrations"):
+            self.applied.add(params["version"])
+        return []
+
+
+class FakeEngine:
+    def __init__(self, applied: set[int] = None):
+        self.log = []
+        self.applied = set(applied or ())
+        self.disposed = False
+
+    def connect(self):
+        return FakeConnection(self.log, self.applied)
+
+    def begin(self):
+        return FakeConnection(self.log, self.applied)
+
+    def dispose(self):
+        self.disposed = True
+
+
+def make_migration(version: int, upgrade=None):
+    return SimpleNamespace(
+        version=version,
+        name=f"m{version}",
+        transactional=True,
+        upgrade=upgrade or (lambda connection: connection.execute(f"-- upgrade {version}"))
+        )
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = FakeEngine(applied={1})
+    monkeypatch.setattr(runner.sqlalchemy, "create_engine", lambda url: engine)
+    return engine
+
+
+def test_pending_migrations_run_between_lock_and_unlock(engine, monkeypatch):
+    monkeypatch.setattr(runner, "load_migrations", lambda: [make_migration(1), make_migration(2)])
+
+    assert runner.run_migrations("postgresql://bench") == [(2, "m2")]
+
+    assert engine.log[0] == "SELECT pg_advisory_lock(:id)"
+    assert engine.log[-1] == "SELECT pg_advisory_unlock(:id)"
+    assert "-- upgrade 1" not in engine.log
+    assert engine.log.index("-- upgrade 2") < len(engine.log) - 1
+    assert engine.applied == {1, 2}
+    assert engine.disposed
+
+
+def test_lock_is_released_when_a_migration_fails(engine, monkeypatch):
+    def broken(connection):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(runner, "load_migrations", lambda: [make_migration(2, broken), make_migration(3)])
+
+    with pytest.raises(RuntimeError):
+        runner.run_migrations("postgresql://bench")
+
+    assert engine.log[-1] == "SELECT pg_advisory_unlock(:id)"
+    assert "-- upgrade 3" not in engine.log
+    assert engine.applied == {1}
+    assert engine.disposed
+
+
+def test_versions_are_loaded_in_order():
+    versions = [migration.version for migration in runner.load_migrations()]
+    assert versions == sorted(versions) == list(range(1, len(versions) + 1))
@@ -0,0 +1,51 @@
+import asyncio
+import uuid
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.config import settings
+from app.monitoring.routes import monitoring_router
+from app.user.tokenizator import create_bearer_token
+
+
+def get_metrics(headers: dict) -> httpx.Response:
+    app = FastAPI()
+    app.include_router(monitoring_router)
+
+    async def scenario() -> httpx.Response:
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            return await client.get("/metrics/user-cache", headers=headers)
+
+    return asyncio.run(scenario())
+
+
+def test_metrics_are_off_without_a_configured_token(monkeypatch):
+    monkeypatch.setattr(settings, "metrics_token", None)
+    assert get_metrics({"X-Metrics-Token": "anything"}).status_code == 404
+
+
+@pytest.mark.parametrize("headers", [
+    {},
+    {"X-Metrics-Token": "wrong"},
+    {"X-Metrics-Token": "s3cret-but-longer"},
+    # a signed-in end user is not enough
+    {"Authorization": f"Bearer {create_bearer_token(uuid.uuid4()).access_token}"},
+])
+def test_metrics_need_the_token(monkeypatch, headers):
+    monkeypatch.setattr(settings, "metrics_token", "s3cret")
+    assert get_metrics(headers).status_code == 403
+
+
+def test_metrics_with_the_token(monkeypatch):
+    monkeypatch.setattr(settings, "metrics_token", "s3cret")
+    response = get_metrics({"X-Metrics-Token": "s3cret"})
+    assert response.status_code == 200
+    assert set(response.json()) >= {"size", "hits", "misses"}
+
+
+def test_metrics_stay_out_of_the_public_schema():
+    app = FastAPI()
+    app.include_router(monitoring_router)
+    assert not any(path.startswith("/metrics") for path in app.openapi()["paths"])
@@ -0,0 +1,233 @@
+import asyncio
+
+from app.config import settings
+from app.smtp_stub import SMTPStubServer
+from app.user.outbox import (
+    EmailOutbox,
+    OutboxMessage,
+    SMTPSender
+    )
+
+
+class FakeSender:
+    """RECORDS BATCHES, FAILS EVERY MESSAGE FOR failures ATTEMPTS, RAISES WHILE down,
+    ALWAYS FAILS THE BODIES IN broken; WITH A gate EVERY SEND WAITS FOR IT"""
+
+    def __init__(
+            self,
+            failures: int = 0,
+            down: int = 0,
+            broken: set[str] = frozenset(),
+            gate: asyncio.Event | None = None
+            ):
+        self.failures = failures
+        self.down = down
+        self.broken = broken
+        self.gate = gate
+        self.batches: list[list[str]] = []
+        self.closed = False
+
+    async def send_batch(self, messages: list[OutboxMessage]) -> list[OutboxMessage]:
+        self.batches.append([message.body for message in messages])
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.down:
+            self.down -= 1
+            raise ConnectionRefusedError
+        return [
+            message for message in messages
+            if message.attempts < self.failures or message.body in self.broken
+            ]
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def make_outbox(**options) -> EmailOutbox:
+    options = {
+        "max_size": 100,
+        "batch_size": 10,
+        "max_attempts": 3,
+        "retry_base_delay": 0.001,
+        "retry_max_delay": 0.01,
+        **options,
+        }
+    return EmailOutbox(**options)
+
+
+async def settle(outbox: EmailOutbox) -> None:
+    """EVERYTHING SENT OR GIVEN UP, RETRIES INCLUDED"""
+    assert await outbox.drain(5)
+    assert outbox.stats()["queued"] == outbox.stats()["waiting_retry"] == 0
+
+
+def test_queued_messages_go_out_in_batches():
+    async def scenario():
+        outbox = make_outbox()
+        sender = FakeSender()
+        for i in range(25):
+            assert outbox.enqueue([f"user{i}@example.com"], str(i))
+        await outbox.start(sender)
+        await settle(outbox)
+        await outbox.stop()
+        return outbox, sender
+
+    outbox, sender = asyncio.run(scenario())
+    assert [len(batch) for batch in sender.batches] == [10, 10, 5]
+    assert [body for batch in sender.batches for body in batch] == [str(i) for i in range(25)]
+    assert outbox.stats()["sent"] == 25
+    assert outbox.stats()["batches"] == 3
+    assert sender.closed
+
+
+def test_rejected_messages_are_retried_until_accepted():
+    async def scenario():
+        outbox = make_outbox()
+        sender = FakeSender(failures=2)
+        await outbox.start(sender)
+        outbox.enqueue(["a@example.com"], "a")
+        outbox.enqueue(["b@example.com"], "b")
+        await settle(outbox)
+        await outbox.stop()
+        return outbox, sender
+
+    outbox, sender = asyncio.run(scenario())
+    stats = outbox.stats()
+    assert stats["sent"] == 2
+    assert stats["retried"] == 4
+    assert stats["failed"] == 0
+    assert sum(len(batch) for batch in sender.batches) == 6
+
+
+def test_message_gives_up_after_max_attempts():
+    async def scenario():
+        outbox = make_outbox(max_attempts=3)
+        await outbox.start(FakeSender(failures=10))
+        outbox.enqueue(["a@example.com"], "a")
+        await settle(outbox)
+        await outbox.stop()
+        return outbox
+
+    stats = asyncio.run(scenario()).stats()
+    assert stats["sent"] == 0
+    assert stats["retried"] == 2
+    assert stats["failed"] == 1
+
+
+def test_whole_batch_is_retried_when_the_server_is_down():
+    async def scenario():
+        outbox = make_outbox()
+        sender = FakeSender(down=1)
+        for i in range(3):
+            outbox.enqueue([f"user{i}@example.com"], str(i))
+        await outbox.start(sender)
+        await settle(outbox)
+        await outbox.stop()
+        return outbox, sender
+
+    outbox, sender = asyncio.run(scenario())
+    assert outbox.stats()["sent"] == 3
+    assert outbox.stats()["retried"] == 3
+    assert sorted(sender.batches[-1]) == ["0", "1", "2"]
+
+
+def test_failing_message_does_not_hold_up_the_rest(monkeypatch):
+    monkeypatch.setattr(settings, "outbox_drain_timeout", 0.01)
+
+    async def scenario():
+        outbox = make_outbox(batch_size=2, retry_base_delay=60, retry_max_delay=60)
+        sender = FakeSender(broken={"bad"})
+        await outbox.start(sender)
+        outbox.enqueue(["bad@example.com"], "bad")
+        outbox.enqueue(["a@example.com"], "a")
+        await asyncio.sleep(0.01)
+        # the failed message waits for its backoff, mail that arrives meanwhile goes out
+        outbox.enqueue(["b@example.com"], "b")
+        outbox.enqueue(["c@example.com"], "c")
+        await asyncio.sleep(0.01)
+        stats = outbox.stats()
+        sender.broken = set()
+        await outbox.stop()
+        return stats, sender
+
+    stats, sender = asyncio.run(scenario())
+    assert sender.batches[:2] == [["bad", "a"], ["b", "c"]]
+    assert stats["sent"] == 3
+    assert stats["waiting_retry"] == 1
+    assert stats["queued"] == 0
+
+
+def test_worker_keeps_sending_while_a_failed_batch_backs_off(monkeypatch):
+    monkeypatch.setattr(settings, "outbox_drain_timeout", 0.01)
+
+    async def scenario():
+        outbox = make_outbox(retry_base_delay=60, retry_max_delay=60)
+        sender = FakeSender(down=1)
+        await outbox.start(sender)
+        outbox.enqueue(["a@example.com"], "a")
+        await asyncio.sleep(0.01)
+        outbox.enqueue(["b@example.com"], "b")
+        await asyncio.sleep(0.01)
+        stats = outbox.stats()
+        await outbox.stop()
+        return stats, sender
+
+    stats, sender = asyncio.run(scenario())
+    assert sender.batches == [["a"], ["b"]]
+    assert stats["sent"] == 1
+    assert stats["waiting_retry"] == 1
+
+
+def test_retry_is_kept_when_the_queue_is_full():
+    async def scenario():
+        outbox = make_outbox(max_size=1, batch_size=1)
+        gate = asyncio.Event()
+        sender = FakeSender(failures=1, gate=gate)
+        await outbox.start(sender)
+        assert outbox.enqueue(["a@example.com"], "a")
+        while not sender.batches:
+            await asyncio.sleep(0)
+        # "a" is in flight, "b" fills the queue, "a"'s retry still goes back on it
+        assert outbox.enqueue(["b@example.com"], "b")
+        assert not outbox.enqueue(["c@example.com"], "c")
+        gate.set()
+        await settle(outbox)
+        await outbox.stop()
+        return outbox
+
+    stats = asyncio.run(scenario()).stats()
+    assert stats["sent"] == 2
+    assert stats["dropped"] == 1
+    assert stats["failed"] == 0
+
+
+def test_full_queue_drops_instead_of_blocking():
+    outbox = make_outbox(max_size=2)
+
+    async def scenario():
+        return [outbox.enqueue(["a@example.com"], str(i)) for i in range(3)]
+
+    assert asyncio.run(scenario()) == [True, True, False]
+    assert outbox.stats()["dropped"] == 1
+
+
+def test_batches_reach_the_smtp_stub_over_pooled_sessions():
+    async def scenario():
+        server = SMTPStubServer()
+        await server.start()
+        try:
+            outbox = make_outbox(batch_size=5)
+            sender = SMTPSender(pool_size=1, hostname=server.host, port=server.port, timeout=5)
+            await outbox.start(sender)
+            for i in range(12):
+                outbox.enqueue([f"user{i}@example.com"], f"message {i}")
+            await settle(outbox)
+            await outbox.stop()
+        finally:
+            await server.stop()
+        return outbox, server
+
+    outbox, server = asyncio.run(scenario())
+    assert outbox.stats()["sent"] == 12
+    assert server.received == 12
+    assert server.connections == 1
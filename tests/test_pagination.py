@@ -0,0 +1,97 @@
+import asyncio
+import datetime
+import uuid
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app import (
+    db,
+    models
+    )
+from app.company.schemas import Company
+from app.pagination import (
+    INVALID_CURSOR_EXCEPTION,
+    PageParams,
+    decode_cursor,
+    encode_cursor,
+    paginate
+    )
+from app.ssh.schemas import SSHPair
+
+
+def test_cursor_round_trip():
+    last_id = uuid.uuid4()
+    cursor = encode_cursor(last_id)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == last_id
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not a cursor",
+    "AAAA",
+    encode_cursor(uuid.uuid4()) + "AAAA",
+    "é" * 22,
+])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(type(INVALID_CURSOR_EXCEPTION)) as error:
+        decode_cursor(cursor)
+    assert error.value is INVALID_CURSOR_EXCEPTION
+
+
+@pytest.fixture
+def fetch_all(monkeypatch):
+    """RECORDS THE QUERY, ANSWERS WITH THE ROWS PUT IN rows"""
+    calls = {"queries": [], "rows": []}
+
+    async def fake_fetch_all(query):
+        calls["queries"].append(query.compile(dialect=postgresql.dialect()))
+        return calls["rows"]
+
+    monkeypatch.setattr(db.database, "fetch_all", fake_fetch_all)
+    return calls
+
+
+def company_row(id_: uuid.UUID) -> dict:
+    return {
+        "id": id_, "company_name": "acme", "address_1": None, "address_2": None, "city": None,
+        "state": None, "country": None, "zip": None, "owner": uuid.uuid4()
+        }
+
+
+def ssh_pair_row(uuid_: uuid.UUID) -> dict:
+    return {
+        "uuid_": uuid_, "owner_id": uuid.uuid4(), "gen_date": datetime.datetime(2024, 1, 1),
+        "pair_name": "key", "owner_name": "owner", "fp_pub": "aa", "fp_prvt": "bb"
+        }
+
+
+@pytest.mark.parametrize("model, schema, order_by, make_row, filters", [
+    (models.Company, Company, "id", company_row, {"company_name": "acme"}),
+    (models.SSHPair, SSHPair, "uuid_", ssh_pair_row, {"pair_name": "key"}),
+])
+def test_paginate_continues_after_the_cursor(fetch_all, model, schema, order_by, make_row, filters):
+    last_seen = uuid.uuid4()
+    ids = sorted((uuid.uuid4() for _ in range(3)), key=lambda value: value.hex)
+    fetch_all["rows"] = [make_row(id_) for id_ in ids]
+    params = PageParams(limit=2, cursor=encode_cursor(last_seen))
+
+    page = asyncio.run(paginate(model.objects.filter(**filters), schema, params, order_by=order_by))
+
+    query = fetch_all["queries"][0]
+    column = f"{model.Meta.tablename}.{order_by}"
+    assert f"{column} > " in str(query)
+    assert f"ORDER BY {column}" in str(query)
+    assert last_seen in query.params.values()
+    assert query.params["param_1"] == 3
+    assert [getattr(item, order_by) for item in page.items] == ids[:2]
+    assert decode_cursor(page.next_cursor) == ids[1]
+
+
+def test_paginate_last_page_has_no_cursor(fetch_all):
+    fetch_all["rows"] = [company_row(uuid.uuid4())]
+    page = asyncio.run(paginate(models.Company.objects.filter(company_name="acme"), Company, PageParams(2, None)))
+    assert " > " not in str(fetch_all["queries"][0])
+    assert page.next_cursor is None
+    assert len(page.items) == 1
@@ -0,0 +1,109 @@
+import uuid
+
+import pytest
+
+from app import models
+from app.user import schemas
+from app.user.auth_service import AuthService
+from app.user.exceptions import UNIQUE_USER_EMAIL_EXCEPTION
+from app.user.user_service import UserService
+
+SSO_USER = {"email": "sso.user@example.com", "first_name": "Sso", "last_name": "User"}
+
+
+@pytest.fixture
+def sent_mail(monkeypatch):
+    sent = []
+
+    async def send_email(email: list[str], message: str) -> None:
+        sent.append(email)
+
+    monkeypatch.setattr(UserService, "send_email", staticmethod(send_email))
+    return sent
+
+
+@pytest.fixture(autouse=True)
+def fast_hashing(monkeypatch):
+    async def hash_password(password: str) -> str:
+        return f"hashed:{password}"
+
+    monkeypatch.setattr(AuthService, "hash_password", staticmethod(hash_password))
+
+
+def new_user(email: str) -> schemas.UserCreate:
+    return schemas.UserCreate(email=email, first_name="New", last_name="User", password_hash="secret")
+
+
+async def companies_of(email: str) -> list[models.Company]:
+    user = await models.User.objects.get(email=email)
+    return await models.Company.objects.filter(owner=user.id).all()
+
+
+def test_new_email_creates_user_and_company(run_in_database, sent_mail):
+    async def scenario():
+        user_id, created = await AuthService()._AuthService__insert_user_with_company({
+            "id": uuid.uuid4(),
+            "email": "new.user@example.com",
+            "first_name": "New",
+            "last_name": "User",
+            "avatar": None,
+            "password_hash": None,
+            "is_email_verif": False,
+            "is_active": True
+            })
+        await AuthService().create_new_user(new_user("second.user@example.com"))
+        user = await models.User.objects.get(email="new.user@example.com")
+        return user_id, created, user, await companies_of(user.email), await companies_of("second.user@example.com")
+
+    user_id, created, user, companies, second_companies = run_in_database(scenario)
+
+    assert created is True
+    assert user.id == user_id
+    assert [company.company_name for company in companies] == ["new.user@example.com"]
+    assert len(second_companies) == 1
+    assert sent_mail == [["second.user@example.com"]]
+
+
+def test_sso_for_existing_email_activates_without_new_company(run_in_database, sent_mail):
+    async def scenario():
+        await AuthService()._AuthService__auth_via_openid(SSO_USER)
+        user = await models.User.objects.get(email=SSO_USER["email"])
+        await AuthService.deactivate_user(user.id)
+
+        user_id, created = await AuthService()._AuthService__insert_user_with_company(
+            {
+                "id": uuid.uuid4(),
+                **SSO_USER,
+                "avatar": None,
+                "password_hash": None,
+                "is_email_verif": False,
+                "is_active": True
+                },
+            activate_existing=True
+            )
+        await AuthService()._AuthService__auth_via_openid(SSO_USER)
+        return user, user_id, created, await models.User.objects.get(id=user.id), await companies_of(user.email)
+
+    user, user_id, created, reloaded, companies = run_in_database(scenario)
+
+    assert created is False
+    assert user_id == user.id
+    assert reloaded.is_active is True
+    assert len(companies) == 1
+    # only the first sign in sends the welcome mail
+    assert sent_mail == [[SSO_USER["email"]]]
+
+
+def test_duplicate_registration_is_rejected(run_in_database, sent_mail):
+    async def scenario():
+        await AuthService().create_new_user(new_user("taken@example.com"))
+        with pytest.raises(type(UNIQUE_USER_EMAIL_EXCEPTION)) as error:
+            await AuthService().create_new_user(new_user("taken@example.com"))
+        return error.value, await models.User.objects.filter(email="taken@example.com").count(), \
+            await companies_of("taken@example.com")
+
+    error, users, companies = run_in_database(scenario)
+
+    assert error is UNIQUE_USER_EMAIL_EXCEPTION
+    assert users == 1
+    assert len(companies) == 1
@@ -0,0 +1,91 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.ssh import ssh_keys
+from app.ssh.exceptions import DOWNLOAD_URL_UNSUPPORTED_EXCEPTION
+from app.ssh.routes import ssh_router
+from app.ssh.ssh_keys import SSHService
+from app.ssh.storage import LocalStorage
+from app.user import schemas
+from app.user.tokenizator import create_bearer_token
+from app.user.user_cache import user_cache
+
+USER = schemas.User(
+    id=uuid.uuid4(),
+    email="owner@example.com",
+    first_name="Owner",
+    last_name="User",
+    avatar=None,
+    is_email_verif=True,
+    is_active=True
+    )
+PAIR_ID = uuid.uuid4()
+PUBLIC_KEY = b"ssh-ed25519 AAAAC3NzaC1lZDI1NTE5AAAAIHq0m8Jx user@host\n"
+
+
+class PresigningStorage(LocalStorage):
+    def presign(self, key: str, expires_in: int, file_name: str) -> str | None:
+        return f"https://bucket.example.com/{key}?expires={expires_in}&name={file_name}"
+
+
+@pytest.fixture(params=[LocalStorage, PresigningStorage], ids=["local", "presigning"])
+def storage(request, tmp_path, monkeypatch):
+    storage = request.param(str(tmp_path))
+    key = SSHService.get_key_path(USER.email, PAIR_ID, "public")
+    asyncio.run(storage.put(key, PUBLIC_KEY))
+    monkeypatch.setattr(ssh_keys, "get_storage", lambda: storage)
+
+    async def get_pair_info(self, uuid_: uuid.UUID):
+        return SimpleNamespace(owner_name=USER.email, uuid_=uuid_)
+
+    monkeypatch.setattr(SSHService, "get_pair_info", get_pair_info)
+    return storage
+
+
+def download(mode: str) -> httpx.Response:
+    user_cache.set(USER, user_cache.generation)
+    token = create_bearer_token(USER.id).access_token
+    app = FastAPI()
+    app.include_router(ssh_router)
+
+    async def scenario() -> httpx.Response:
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            return await client.get(
+                "/ssh/download-ssh-pub",
+                params={"uuid_": str(PAIR_ID), "mode": mode},
+                headers={"Authorization": f"Bearer {token}"}
+                )
+
+    return asyncio.run(scenario())
+
+
+def test_stream_mode_sends_the_file(storage):
+    response = download("stream")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-pem-file"
+    assert response.headers["content-disposition"] == f'attachment; filename="{PAIR_ID}-public.pem"'
+    assert response.content == PUBLIC_KEY
+
+
+@pytest.mark.parametrize("mode", ["url", "redirect"])
+def test_url_modes(storage, mode):
+    response = download(mode)
+
+    if isinstance(storage, PresigningStorage):
+        url = f"https://bucket.example.com/{USER.email}/ssh/{PAIR_ID}-public.pem"
+        if mode == "url":
+            assert response.status_code == 200
+            assert response.json()["url"].startswith(url)
+        else:
+            assert response.status_code == 307
+            assert response.headers["location"].startswith(url)
+    else:
+        # no silent fallback to a PEM body
+        assert response.status_code == DOWNLOAD_URL_UNSUPPORTED_EXCEPTION.status_code
+        assert response.json()["detail"] == DOWNLOAD_URL_UNSUPPORTED_EXCEPTION.detail
@@ -0,0 +1,55 @@
+import pytest
+
+from app.static import (
+    etag_matches,
+    parse_range
+    )
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=10-", (10, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=900-5000", (900, 999)),
+    (" bytes=0-0 ", (0, 0)),
+])
+def test_parse_range_satisfiable(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header, size", [
+    ("bytes=1000-", 1000),
+    ("bytes=50-10", 1000),
+    ("bytes=-0", 1000),
+    ("bytes=-10", 0),
+    ("bytes=0-", 0),
+])
+def test_parse_range_unsatisfiable(header, size):
+    assert parse_range(header, size) is None
+
+
+@pytest.mark.parametrize("header", [
+    "bytes=-",
+    "bytes=0-10,20-30",
+    "items=0-10",
+    "bytes=a-b",
+    "",
+])
+def test_parse_range_rejects_other_forms(header):
+    with pytest.raises(ValueError):
+        parse_range(header, 1000)
+
+
+@pytest.mark.parametrize("header, matches", [
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"xyz", "abc"', True),
+    ('"xyz" ,W/"abc" ', True),
+    ("*", True),
+    ('"abcd"', False),
+    ("abc", False),
+    ('"xyz"', False),
+])
+def test_etag_matches(header, matches):
+    assert etag_matches(header, '"abc"') is matches